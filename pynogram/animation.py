@@ -303,6 +303,10 @@ class CursesRenderer(BaseAsciiRenderer):
         for arg in args:
             self.stream.put(arg)
 
+    def _print_lines(self, lines):
+        # every line should be a separate item in the queue
+        self._print(*lines)
+
     def render(self):
         # clear the screen before next board
         self._print(self.separator)
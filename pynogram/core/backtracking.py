@@ -57,6 +57,21 @@ class _SearchNode(object):
         }
 
 
+class _LazyDict(dict):
+    """
+    The dictionary that calculates the missing values
+    with the given function (and remembers them)
+    """
+
+    def __init__(self, func):
+        super(_LazyDict, self).__init__()
+        self.func = func
+
+    def __missing__(self, key):
+        value = self[key] = self.func(key)
+        return value
+
+
 class Solver(object):
     """
     Solve the nonogram using contradictions and depth-first search
@@ -170,25 +185,35 @@ class Solver(object):
             LOG.warning("The probe is useless: color '%s' already unset", assumption)
             return False, None
 
-        save = board.make_snapshot()
+        if rollback:
+            # record only the changed lines instead of copying the whole board
+            board.start_journal()
+            save = None
+        else:
+            save = board.make_snapshot()
 
         try:
             solved_cells = self.propagate_change(cell_state)
         except NonogramError:
             LOG.debug('Contradiction', exc_info=True)
             # rollback solved cells
-            board.restore(save)
+            self._rollback(save)
 
         else:
             if board.is_solved_full:
                 self._add_solution()
 
             if rollback:
-                board.restore(save)
+                self._rollback(save)
                 return False, solved_cells
 
             return False, save
 
+        finally:
+            if rollback:
+                # on any unexpected error do not leave the journal recording
+                board.stop_journal()
+
         if USE_CONTRADICTION_RESULTS:
             before_contradiction = board.make_snapshot()
         else:
@@ -210,6 +235,16 @@ class Solver(object):
 
         return True, before_contradiction
 
+    def _rollback(self, snapshot):
+        """
+        Restore the board from the snapshot or,
+        if no snapshot was made, from the journal
+        """
+        if snapshot is None:
+            self.board.rollback_journal()
+        else:
+            self.board.restore(snapshot)
+
     def _new_jobs_from_solution(self, cell_state, previous_board, is_contradiction):
         board = self.board
 
@@ -362,9 +397,18 @@ class Solver(object):
     def _get_all_unsolved_jobs(self, choose_from_cells=None):
         board = self.board
 
+        # every line's rate is calculated only once, on the first demand
+        row_rates = _LazyDict(board.row_solution_rate)
+        column_rates = _LazyDict(board.column_solution_rate)
+
         if choose_from_cells is None:
-            # add every cell
-            choose_from_cells = product(range(board.height), range(board.width))
+            # add every cell on the intersection of unsolved rows and columns:
+            # the cells of completely solved lines can not be probed anyway
+            unsolved_rows = [index for index in range(board.height)
+                             if row_rates[index] != 1]
+            unsolved_columns = [index for index in range(board.width)
+                                if column_rates[index] != 1]
+            choose_from_cells = product(unsolved_rows, unsolved_columns)
 
         probe_jobs = PriorityDict()
 
@@ -378,9 +422,7 @@ class Solver(object):
             # if no_unsolved >= 4 and skip_low_rated:
             #     continue
 
-            row_rate = board.row_solution_rate(pos.row_index)
-            column_rate = board.column_solution_rate(pos.column_index)
-            cell_rate = row_rate + column_rate
+            cell_rate = row_rates[pos.row_index] + column_rates[pos.column_index]
 
             probe_jobs[pos] = 4 - cell_rate + no_unsolved
 
@@ -115,6 +115,9 @@ class NonogramGrid(RenderedMixin):
     Abstract nonogram grid with descriptions and cells
     """
 
+    # the list of changes to rollback, see `MultipleSolutionGrid.start_journal`
+    _journal = None
+
     def __init__(self, columns, rows, cells=None, **renderer_params):
         """
         :param columns: iterable of vertical clues
@@ -206,7 +209,8 @@ class NonogramGrid(RenderedMixin):
         :type cell_state: CellState
         """
         row_index, column_index, color = cell_state
-        self.cells[row_index][column_index] = color
+        self._record_cell(row_index, column_index)
+        self._write_cell(row_index, column_index, color)
 
     @property
     def is_colored(self):
@@ -233,20 +237,63 @@ class NonogramGrid(RenderedMixin):
         """Get the grid's column at given index"""
         return (row[index] for row in self.cells)
 
+    def get_line_tuple(self, index, is_column):
+        """
+        Get the immutable copy of the grid's row (or column) at given index.
+        Can be used as a key for the line solutions cache.
+        """
+        if is_column:
+            return tuple(self.get_column(index))
+
+        return tuple(self.get_row(index))
+
     # noinspection PyUnusedLocal
     def set_row(self, index, value):
         """Set the grid's row at given index"""
-        self.cells[index] = list(value)
+        self._record_row(index)
+        self._write_row(index, value)
 
         self.row_updated(index)
 
     # noinspection PyUnusedLocal
     def set_column(self, index, value):
         """Set the grid's column at given index"""
+        self._record_column(index)
+        self._write_column(index, value)
+
+        self.column_updated(index)
+
+    def _write_row(self, index, value):
+        """
+        Low-level row change.
+        All the changes of the grid's cells should go through
+        the `_write_*` methods to keep the derived data in sync.
+        """
+        self.cells[index] = list(value)
+
+    def _write_column(self, index, value):
+        """Low-level column change"""
         for row_index, item in enumerate(value):
             self.cells[row_index][index] = item
 
-        self.column_updated(index)
+    def _write_cell(self, row_index, column_index, value):
+        """Low-level cell change"""
+        self.cells[row_index][column_index] = value
+
+    def _record_row(self, index):
+        """Save the row's state before changing it (if the journal is on)"""
+        if self._journal is not None:
+            self._journal.append((index, None, copy(self.cells[index])))
+
+    def _record_column(self, index):
+        """Save the column's state before changing it (if the journal is on)"""
+        if self._journal is not None:
+            self._journal.append((None, index, list(self.get_column(index))))
+
+    def _record_cell(self, row_index, column_index):
+        """Save the cell's state before changing it (if the journal is on)"""
+        if self._journal is not None:
+            self._journal.append((row_index, column_index, self.cells[row_index][column_index]))
 
     def __str__(self):
         return '{}({}x{})'.format(self.__class__.__name__, self.height, self.width)
@@ -410,6 +457,44 @@ class MultipleSolutionGrid(NonogramGrid, ABC):
         """
         call_if_callable(self.on_restored, snapshot)
 
+    def start_journal(self):
+        """
+        Start to record all the changes of a board,
+        so they can be cheaply reverted with `rollback_journal`.
+
+        This is a lightweight alternative to the `make_snapshot`/`restore` pair
+        when only a few lines are expected to change.
+        """
+        if self._journal is not None:
+            raise RuntimeError('The journal is already started')
+
+        self._journal = []
+
+    def stop_journal(self):
+        """
+        Stop to record the changes and forget the recorded ones
+        """
+        self._journal = None
+
+    def rollback_journal(self):
+        """
+        Revert all the changes recorded since the `start_journal`
+        and stop the recording.
+        """
+        journal, self._journal = self._journal, None
+        if journal is None:
+            return
+
+        for row_index, column_index, value in reversed(journal):
+            if column_index is None:
+                self._write_row(row_index, value)
+            elif row_index is None:
+                self._write_column(column_index, value)
+            else:
+                self._write_cell(row_index, column_index, value)
+
+        self.restored(self.cells)
+
     def _current_state_in_solutions(self):
         for i, sol in enumerate(self.solutions):
             diff = next(self.diff(sol, self.cells, have_deletions=True), None)
@@ -783,18 +868,36 @@ class NumpyBoard(BaseBoard, ABC):
         self.restore(self.cells)
 
     def get_column(self, index):
-        # self.cells.transpose([1, 0, 2])[index]
+        # the transposed array is a view, not a copy,
+        # so it always reflects the direct changes of the cells
         return self.cells.T[index]
 
-    def set_column(self, index, value):
+    def get_line_tuple(self, index, is_column):
+        # iterating over the numpy array is much slower than over a list
+        if is_column:
+            return tuple(self.cells[:, index].tolist())
+
+        return tuple(self.cells[index].tolist())
+
+    def _write_row(self, index, value):
+        self.cells[index] = value
+
+    def _write_column(self, index, value):
         self.cells[:, index] = value
-        self.column_updated(index)
+
+    def _write_cell(self, row_index, column_index, value):
+        self.cells[row_index, column_index] = value
+
+    @property
+    def cells_dtype(self):
+        """The type of numpy array elements to store the cells"""
+        return object
 
     def make_snapshot(self):
         return copy(self.cells)
 
     def restore(self, snapshot):
-        self.cells = np.array(snapshot)
+        self.cells = np.array(snapshot, dtype=self.cells_dtype)
 
     def _current_state_in_solutions(self):
         for solution in self.solutions:
@@ -804,6 +907,26 @@ class NumpyBoard(BaseBoard, ABC):
         return False
 
 
+def _unknown_count(line):
+    """
+    The number of unsolved cells in the line.
+    Use the C-level `count` instead of iterating over the cells.
+    """
+    try:
+        return line.count(UNKNOWN)
+    except AttributeError:
+        # numpy arrays have no `count`
+        return list(line).count(UNKNOWN)
+
+
+def _clues_min_sizes(descriptions):
+    """
+    The minimum number of cells required to fit every given clue:
+    the sum of all the blocks with the single spaces between them.
+    """
+    return [sum(clue) + len(clue) - 1 if clue else 0 for clue in descriptions]
+
+
 class BlackBoard(BaseBoard):
     """
     Black-and-white nonogram board
@@ -818,21 +941,15 @@ class BlackBoard(BaseBoard):
 
     @classmethod
     def validate_descriptions_size(cls, descriptions, max_size):
-        for clue in descriptions:
-            need_cells = sum(clue)
-            if clue:
-                # also need at least one space between every two blocks
-                need_cells += len(clue) - 1
-
-            LOG.debug('Clue: %s; Need: %s; Available: %s.',
-                      clue, need_cells, max_size)
+        # also need at least one space between every two blocks
+        for clue, need_cells in zip(descriptions, _clues_min_sizes(descriptions)):
             if need_cells > max_size:
                 raise ValueError('Cannot allocate clue {} in just {} cells'.format(
                     list(clue), max_size))
 
     def validate_colors(self, vertical, horizontal):
-        boxes_in_columns = sum(sum(block) for block in vertical)
-        boxes_in_rows = sum(sum(block) for block in horizontal)
+        boxes_in_columns = sum(map(sum, vertical))
+        boxes_in_rows = sum(map(sum, horizontal))
         if boxes_in_rows != boxes_in_columns:
             raise ValueError('Number of boxes differs: {} (rows) and {} (columns)'.format(
                 boxes_in_rows, boxes_in_columns))
@@ -854,24 +971,44 @@ class BlackBoard(BaseBoard):
         row_index, column_index, bad_state = cell_state
         if self.cells[row_index][column_index] != UNKNOWN:
             raise ValueError('Cannot unset already set cell %s' % ([row_index, column_index]))
-        self.cells[row_index][column_index] = invert(bad_state)
+        self._record_cell(row_index, column_index)
+        self._write_cell(row_index, column_index, invert(bad_state))
 
     @property
     def is_solved_full(self):
-        for row in self.cells:
-            for cell in row:
-                if cell == UNKNOWN:
-                    return False
-        return True
+        # the cells can be changed directly, so always count them
+        # (with the C-level `count`, stopping at the first unsolved row)
+        return all(_unknown_count(row) == 0 for row in self.cells)
+
+    @property
+    def unsolved_cells_number(self):
+        """How many cells of the board are not solved yet"""
+        return sum(map(_unknown_count, self.cells))
+
+    def row_solution_rate(self, index):
+        return (self.width - _unknown_count(self.cells[index])) / self.width
+
+    def column_solution_rate(self, index):
+        return (self.height - _unknown_count(self.get_column(index))) / self.height
+
+    @property
+    def solution_rate(self):
+        size = self.width * self.height
+        if not size:
+            return super(BlackBoard, self).solution_rate
+
+        return (size - self.unsolved_cells_number) / size
 
     @classmethod
     def line_solution_rate(cls, row, size=None):
         """How many cells in a given line are known to be box or space"""
 
+        # the row can be a generator, so materialize it once
+        row = list(row)
         if size is None:
             size = len(row)
 
-        return sum(1 for cell in row if cell != UNKNOWN) / size
+        return (len(row) - row.count(UNKNOWN)) / size
 
     @classmethod
     def cell_solution_rate(cls, cell):
@@ -974,7 +1111,7 @@ class ReduceColorToBlackMixin(MultipleSolutionGrid, ABC):
 
                 if new_color != current_color:
                     updated.append(index)
-                    self.cells[index][column_index] = new_color
+                    self._write_cell(index, column_index, new_color)
 
             if updated:
                 # can be false positives if the solved line
@@ -997,7 +1134,7 @@ class ReduceColorToBlackMixin(MultipleSolutionGrid, ABC):
 
                 if new_color != current_color:
                     updated.append(index)
-                    self.cells[row_index][index] = new_color
+                    self._write_cell(row_index, index, new_color)
 
             if updated:
                 # can be false positives if the solved line
@@ -1028,7 +1165,7 @@ class ReduceColorToBlackMixin(MultipleSolutionGrid, ABC):
                     new_color = single_to_color[cell]
 
                     if new_color != current_color:
-                        self.cells[row_index][column_index] = new_color
+                        self._write_cell(row_index, column_index, new_color)
 
         new_board.on_column_update = on_column_update
         new_board.on_row_update = on_row_update
@@ -1135,7 +1272,8 @@ class ColorBoard(BaseBoard, ReduceColorToBlackMixin):
             LOG.debug('(%d, %d) new state: %s',
                       row_index, column_index, new_value)
             new_value = from_two_powers(new_value)
-            self.cells[row_index][column_index] = new_value
+            self._record_cell(row_index, column_index)
+            self._write_cell(row_index, column_index, new_value)
         else:
             raise ValueError("Cannot unset the colors {!r} from cell {} ({})".format(
                 bad_state, (row_index, column_index), colors))
@@ -1240,7 +1378,7 @@ class ColorBoard(BaseBoard, ReduceColorToBlackMixin):
                 if new_color != cell:
                     LOG.info('Update cell (%i, %i): %i --> %i',
                              row_index, column_index, cell, new_color)
-                    row[column_index] = new_color
+                    self._write_cell(row_index, column_index, new_color)
 
     @property
     def _color_map_ids(self):
@@ -1387,6 +1525,21 @@ class NumpyBlackBoard(BlackBoard, NumpyBoard):
 class NumpyColorBoard(ColorBoard, NumpyBoard):
     """Colored board that uses numpy matrix to store the cells"""
 
+    @init_once
+    def _cells_dtype(self):
+        # every color takes a single bit, so choose the smallest integer
+        # that can hold all of them (and the sign bit)
+        bits = self.init_cell_state.bit_length()
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            if bits < np.iinfo(dtype).bits:
+                return dtype
+
+        return object
+
+    @property
+    def cells_dtype(self):
+        return self._cells_dtype()
+
 
 class BlottedBoardMixin(BaseBoard, ABC):
     """Common operations for boards with blotted clues"""
@@ -1399,8 +1552,20 @@ class BlottedBoardMixin(BaseBoard, ABC):
         """Reducing can work incorrectly on blotted descriptions"""
         return None, None
 
+    @init_once
+    def _lines_attempts(self):
+        # the descriptions never change (the board does not get reduced),
+        # so the number of attempts can be calculated only once
+        return {
+            True: [self._attempts_to_try(True, index) for index in range(self.width)],
+            False: [self._attempts_to_try(False, index) for index in range(self.height)],
+        }
+
     def attempts_to_try(self, is_column, index):
         """How many description combinations to go through for given row or column"""
+        return self._lines_attempts()[is_column][index]
+
+    def _attempts_to_try(self, is_column, index):
         if is_column:
             description = self.columns_descriptions[index]
             line_size = self.height
@@ -1531,7 +1696,7 @@ class BlottedColorBoard(ColorBoard, BlottedBoardMixin):
                 if new_cell_color != cell:
                     LOG.info('Update cell (%i, %i): %i --> %i',
                              row_index, col_index, cell, new_cell_color)
-                    row[col_index] = new_cell_color
+                    self._write_cell(row_index, col_index, new_cell_color)
 
 
 def _solve_on_space_hints(board, hints):
@@ -1548,7 +1713,7 @@ def _solve_on_space_hints(board, hints):
 
         # pad with spaces
         solution = cells + ([SPACE] * (board.width - len(cells)))
-        board.cells[i] = solution
+        board.set_row(i, solution)
 
 
 def make_board(*args, **kwargs):
@@ -34,6 +34,16 @@ SOLVERS = {
 }
 
 
+def get_solver(method):
+    """
+    Find the line solver class by its name
+    """
+    try:
+        return SOLVERS[method]
+    except KeyError:
+        raise KeyError("Cannot find solver '%s'" % method)
+
+
 def solve_line(desc, line, method='reverse_tracking', normalized=False):
     """
     Utility for row solving that can be used in multiprocessing map
@@ -51,12 +61,7 @@ def solve_line(desc, line, method='reverse_tracking', normalized=False):
         # desc = tuple(desc)
         line = normalize_row(line)
 
-    try:
-        solver = SOLVERS[method]
-    except KeyError:
-        raise KeyError("Cannot find solver '%s'" % method)
-
-    return solver.solve(desc, line)
+    return get_solver(method).solve(desc, line)
 
 
 # TODO: automatically set the log level for each registered solver
@@ -229,29 +229,21 @@ class NonogramFSM(fsm.FiniteStateMachine):
         transition_table = TransitionTable.with_capacity(len(row) + 1)
         transition_table.append_transition(0, self.initial_state)
 
-        def _shift_one_cell(cell_type, trans_index,
-                            previous_step_state, previous_state, desc_cell=None):
-            if desc_cell:  # pragma: no cover
-                LOG.debug('Add states with %s transition', desc_cell)
-
-            new_state = self.reaction(cell_type, previous_state)
-            if new_state is None:
-                if desc_cell:  # pragma: no cover
-                    LOG.debug('Cannot go from %s with the %s cell', previous_state, desc_cell)
-            else:
-                transition_table.append_transition(
-                    trans_index, new_state, previous_step_state, cell_type)
-
-        # optimize lookups
+        # optimize lookups: the clue is fixed, so the machine's transitions
+        # are simply read from the state map (the same as `self.reaction` does)
         _types_for_cell = self._types_for_cell
+        _transition = self.state_map.get
+        _append_transition = transition_table.append_transition
 
         for i, cell in enumerate(row):
             transition_index = i + 1
+            cell_types = _types_for_cell(cell)
 
             for prev_state, prev in iteritems(transition_table[i]):
-                for _type in _types_for_cell(cell):
-                    _shift_one_cell(_type, transition_index,
-                                    prev, prev_state)
+                for cell_type in cell_types:
+                    new_state = _transition((prev_state, cell_type))
+                    if new_state is not None:
+                        _append_transition(transition_index, new_state, prev, cell_type)
 
         return transition_table
 
@@ -436,10 +428,11 @@ class BaseMachineSolver(BaseLineSolver):
 
     def __init__(self, description, line):
         super(BaseMachineSolver, self).__init__(description, line)
-        self.nfsm = self.make_nfsm(description)
+        self.nfsm = self.get_nfsm(description)
 
     NFSM_CLASS = NonogramFSM
     FSM_CACHE = Cache(1000)
+    NFSM_CACHE = Cache(1000)
 
     @classmethod
     def get_state_map(cls, description):
@@ -476,6 +469,24 @@ class BaseMachineSolver(BaseLineSolver):
 
         return cls.NFSM_CLASS(description, state_map)
 
+    @classmethod
+    def get_nfsm(cls, description):
+        """
+        The finite state machine for the given description
+        shared between all the solvers of the same type.
+
+        The solving methods do not change the machine's state,
+        so the machine can be safely reused for every line with the same clue.
+        """
+        key = (cls.NFSM_CLASS, description)
+
+        nfsm = cls.NFSM_CACHE.get(key)
+        if nfsm is None:
+            nfsm = cls.make_nfsm(description)
+            cls.NFSM_CACHE.save(key, nfsm)
+
+        return nfsm
+
 
 class PartialMatchSolver(BaseMachineSolver):
     """
@@ -5,16 +5,18 @@ from __future__ import unicode_literals, print_function
 
 import logging
 import time
+from itertools import compress, count
+from operator import ne
 
 from six.moves import (
-    zip, range,
+    range, map,
 )
 
 from pynogram.core.common import (
     UNKNOWN, BOX, SPACE,
     is_color_cell,
 )
-from pynogram.core.line import solve_line
+from pynogram.core.line import get_solver
 # from pynogram.core.line.machine import assert_match
 from pynogram.utils.priority_dict import PriorityDict
 
@@ -35,6 +37,22 @@ def _is_pixel_updated(old, new):
     return True
 
 
+def _diff_cells(old_line, new_line):
+    """
+    Find the indexes of the cells updated in the new line.
+
+    Only the changed cells go through the (slow) `_is_pixel_updated` check,
+    the rest of the line is compared with no Python-level loop at all.
+    """
+    changed = list(compress(count(), map(ne, old_line, new_line)))
+
+    if __debug__:
+        for i in changed:
+            _is_pixel_updated(old_line[i], new_line[i])
+
+    return changed
+
+
 def solve_row(board, index, is_column, method):
     """
     Solve a line with the solving `method`.
@@ -43,16 +61,22 @@ def solve_row(board, index, is_column, method):
 
     Return the list of new jobs that should be solved next (one for each solved cell).
     """
+    return _solve_row(board, index, is_column, get_solver(method))
+
 
-    # start = time.time()
+def _solve_row(board, index, is_column, solver):
+    """
+    Solve a line with the line solver class.
+    See the `solve_row` for details.
+    """
 
     if is_column:
         row_desc = board.columns_descriptions[index]
-        row = tuple(board.get_column(index))
+        row = board.get_line_tuple(index, is_column=True)
         # desc = 'column'
     else:
         row_desc = board.rows_descriptions[index]
-        row = tuple(board.get_row(index))
+        row = board.get_line_tuple(index, is_column=False)
         # desc = 'row'
 
     # pre_solution_rate = board.line_solution_rate(row)
@@ -66,7 +90,7 @@ def solve_row(board, index, is_column, method):
     # LOG.debug('Solving %s %s: %s. Partial: %s', index,
     #           'column' if is_column else 'row', row_desc, row)
 
-    updated = solve_line(row_desc, row, method=method, normalized=True)
+    updated = solver.solve(row_desc, row)
 
     new_jobs = []
 
@@ -75,9 +99,8 @@ def solve_row(board, index, is_column, method):
         # LOG.debug('Queue: %s', jobs_queue)
         # LOG.debug(row)
         # LOG.debug(updated)
-        for i, (pre, post) in enumerate(zip(row, updated)):
-            if _is_pixel_updated(pre, post):
-                new_jobs.append((not is_column, i))
+        is_row = not is_column
+        new_jobs = [(is_row, i) for i in _diff_cells(row, updated)]
         # LOG.debug('Queue: %s', jobs_queue)
         # LOG.debug('New info on %s %s: %s', desc, index, [job_index for _, job_index in new_jobs])
 
@@ -86,7 +109,6 @@ def solve_row(board, index, is_column, method):
         else:
             board.set_row(index, updated)
 
-    # LOG.debug('%ss solution: %.6f sec', desc, time.time() - start)
     return new_jobs
 
 
@@ -151,7 +173,10 @@ def _solve_with_method(
 
     has_blots = board.has_blots
 
-    start = time.time()
+    # do not waste time on the timing and formatting that will not be logged
+    log_info = not contradiction_mode and LOG.isEnabledFor(logging.INFO)
+    if log_info:
+        start = time.time()
     lines_solved = 0
 
     # every job is a tuple (is_column, index)
@@ -162,8 +187,9 @@ def _solve_with_method(
     # when adding column, `is_column = True = 1`
     # heap always pops the lowest item, so the rows will go first
 
-    LOG.debug('Solving %s rows and %s columns with %r method',
-              row_indexes, column_indexes, method)
+    if LOG.isEnabledFor(logging.DEBUG):
+        LOG.debug('Solving %s rows and %s columns with %r method',
+                  row_indexes, column_indexes, method)
 
     line_jobs = PriorityDict()
     all_jobs = set()
@@ -215,19 +241,24 @@ def _solve_with_method(
         _add_job(new_job, priority)
 
     total_cells_solved = 0
+    # find the solver once instead of doing that for every line
+    solver = get_solver(method)
+
+    # optimize lookups
+    attempts_to_try = board.attempts_to_try if has_blots else None
 
     for (is_column, index), priority in line_jobs.sorted_iter():
         # LOG.info('Solving %s %s with priority %s', index,
         #          'column' if is_column else 'row', priority)
 
-        new_jobs = solve_row(board, index, is_column, method)
+        new_jobs = _solve_row(board, index, is_column, solver)
 
         total_cells_solved += len(new_jobs)
         for new_job in new_jobs:
             new_priority = priority - 1
-            if board.has_blots:
+            if has_blots:
                 # the more attempts the less priority
-                new_priority = board.attempts_to_try(*new_job)
+                new_priority = attempts_to_try(*new_job)
 
             # lower priority = more priority
             _add_job(new_job, new_priority)
@@ -242,7 +273,8 @@ def _solve_with_method(
         # if rate != 1:
         #     LOG.warning('The nonogram is not solved full (%r). The rate is %.4f',
         #                 method, rate)
-        LOG.info('Full solution: %.6f sec', time.time() - start)
-        LOG.info('Lines solved: %i', lines_solved)
+        if log_info:
+            LOG.info('Full solution: %.6f sec', time.time() - start)
+            LOG.info('Lines solved: %i', lines_solved)
 
     return total_cells_solved, all_jobs
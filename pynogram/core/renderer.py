@@ -5,8 +5,6 @@ Defines various renderers for the game of nonogram
 
 from __future__ import unicode_literals, print_function, division
 
-from itertools import combinations
-
 try:
     from abc import ABC
 except ImportError:
@@ -17,11 +15,14 @@ except ImportError:
 
 import codecs
 import logging
+from collections import OrderedDict
 from sys import stdout
+from xml.etree import ElementTree as etree
 
+from memoized import memoized
 from six import (
     integer_types, text_type,
-    iteritems, itervalues,
+    iteritems,
     PY2,
 )
 
@@ -33,9 +34,7 @@ from pynogram.core.common import (
     BlottedBlock,
 )
 from pynogram.utils.iter import (
-    pad,
-    split_seq,
-    max_safe,
+    interleave, max_safe,
 )
 from pynogram.utils.other import (
     two_powers, from_two_powers,
@@ -53,6 +52,8 @@ if PY2:
 class Cell(object):
     """Represent basic rendered cell"""
 
+    __slots__ = ('icon',)
+
     DEFAULT_ICON = ' '
 
     def __init__(self, icon=None):
@@ -71,9 +72,15 @@ class ThumbnailCell(Cell):
     Represent upper-left cell
     (where the thumbnail of the puzzle usually drawn).
     """
+
+    __slots__ = ()
+
     DEFAULT_ICON = '#'
 
 
+_CLUE_CELLS = dict()
+
+
 class ClueCell(Cell):
     """
     Represent cell that is part of description (clue).
@@ -82,6 +89,8 @@ class ClueCell(Cell):
 
     BLOTTED_SYMBOL = '?'
 
+    __slots__ = ('value', 'color', '_ascii_icon')
+
     def __init__(self, value):
         super(ClueCell, self).__init__()
         if is_list_like(value):
@@ -89,7 +98,26 @@ class ClueCell(Cell):
         else:
             self.value, self.color = value, None
 
+        # the clue never changes, so the icon can be calculated only once
+        self._ascii_icon = self._get_ascii_icon()
+
+    @classmethod
+    def get(cls, value):
+        """
+        The clue cells are read-only and most of the clues are the same
+        small numbers, so share a single cell for every clue value
+        """
+        key = (cls, tuple(value) if is_list_like(value) else value)
+
+        cell = _CLUE_CELLS.get(key)
+        if cell is None:
+            cell = _CLUE_CELLS[key] = cls(value)
+        return cell
+
     def ascii_icon(self):
+        return self._ascii_icon
+
+    def _get_ascii_icon(self):
         """
         Gets a symbolic representation of a cell given its state
         and predefined table `icons`
@@ -111,13 +139,16 @@ class ClueCell(Cell):
 class GridCell(Cell):
     """Represent the main area cell"""
 
+    __slots__ = ('renderer', 'colored', 'value')
+
     def __init__(self, value, renderer, colored=False):
         super(GridCell, self).__init__()
 
         self.renderer = renderer
         self.colored = colored
         if self.colored:
-            self.value = tuple(two_powers(value))
+            # already a tuple, remembered for every value
+            self.value = two_powers(value)
         else:
             self.value = value
 
@@ -145,6 +176,85 @@ class GridCell(Cell):
             self.__class__.__name__, self.value)
 
 
+class _SvgGroup(object):
+    """
+    Lightweight SVG group of the simple elements.
+
+    The board can consist of thousands of such elements,
+    so serialize them directly with ElementTree instead of
+    creating (and validating) the svgwrite element for every one.
+    The produced XML is the same as svgwrite's one.
+    """
+
+    elementname = 'g'
+
+    def __init__(self, class_):
+        self.class_ = class_
+
+    def get_xml(self):
+        """The XML representation as `ElementTree` object"""
+        group = etree.Element(self.elementname)
+        group.set('class', self.class_)
+        self._add_children(group)
+        return group
+
+    def _add_children(self, group):
+        raise NotImplementedError()
+
+
+class _UseGroup(_SvgGroup):
+    """
+    SVG group of the `<use>` elements referring to the same symbol
+    """
+
+    def __init__(self, id_):
+        super(_UseGroup, self).__init__(id_)
+        self.insert_points = []
+
+    def _add_children(self, group):
+        href = '#' + self.class_
+        for x_pos, y_pos in self.insert_points:
+            # the attributes are sorted as in svgwrite
+            etree.SubElement(group, 'use', OrderedDict([
+                ('x', str(x_pos)),
+                ('xlink:href', href),
+                ('y', str(y_pos)),
+            ]))
+
+
+class _LinesGroup(_SvgGroup):
+    """
+    SVG group of the `<line>` elements
+    """
+
+    def __init__(self, class_, lines):
+        super(_LinesGroup, self).__init__(class_)
+        self.lines = lines
+
+    def _add_children(self, group):
+        for (x_start, y_start), (x_end, y_end), line_class in self.lines:
+            # the attributes are sorted as in svgwrite
+            attributes = OrderedDict()
+            if line_class:
+                attributes['class'] = line_class
+            attributes['x1'] = str(x_start)
+            attributes['x2'] = str(x_end)
+            attributes['y1'] = str(y_start)
+            attributes['y2'] = str(y_end)
+
+            etree.SubElement(group, 'line', attributes)
+
+
+# all the renderers available by name
+RENDERERS = dict()
+
+
+def _register_renderer(cls):
+    """Make the renderer class available by its `__rend_name__`"""
+    RENDERERS[cls.__rend_name__] = cls
+    return cls
+
+
 class _DummyBoard(object):
     """
     Stub for renderer initialization
@@ -160,6 +270,7 @@ class Renderer(object):
     def __init__(self, board=None):
         self.cells = None
         self.board = None
+        self._clues_sizes = None
         self.board_init(board)
 
     def board_init(self, board=None):
@@ -183,15 +294,37 @@ class Renderer(object):
         """The full visual width of a board"""
         return self.side_width + self.board.width
 
+    def _get_clues_sizes(self):
+        """
+        The sizes of the header and of the side blocks.
+
+        Calculated only once for the given descriptions
+        (they can be replaced when the board gets reduced).
+        """
+        columns_descriptions = self.board.columns_descriptions
+        rows_descriptions = self.board.rows_descriptions
+
+        cached = self._clues_sizes
+        if cached is not None and \
+                cached[0] is columns_descriptions and cached[1] is rows_descriptions:
+            return cached[2]
+
+        sizes = (
+            max_safe(map(len, columns_descriptions), default=0),
+            max_safe(map(len, rows_descriptions), default=0),
+        )
+        self._clues_sizes = (columns_descriptions, rows_descriptions, sizes)
+        return sizes
+
     @property
     def header_height(self):
         """The size of the header block with columns descriptions"""
-        return max_safe(map(len, self.board.columns_descriptions), default=0)
+        return self._get_clues_sizes()[0]
 
     @property
     def side_width(self):
         """The width of the side block with rows descriptions"""
-        return max_safe(map(len, self.board.rows_descriptions), default=0)
+        return self._get_clues_sizes()[1]
 
     def render(self):
         """Actually print out the board"""
@@ -249,7 +382,31 @@ class StreamRenderer(Renderer, ABC):
     def _print(self, *args):
         return print(*args, file=self.stream)
 
+    def _print_lines(self, lines):
+        """
+        Print out all the lines with a single write to the stream
+        """
+        if lines:
+            self.stream.write('\n'.join(lines) + '\n')
 
+
+class _IconsTable(dict):
+    """
+    Remember the icon of every rendered cell:
+    most of the cells are shared, so the icon
+    gets calculated only once for each of them.
+    """
+
+    def __init__(self, cell_icon):
+        super(_IconsTable, self).__init__()
+        self.cell_icon = cell_icon
+
+    def __missing__(self, cell):
+        ico = self[cell] = self.cell_icon(cell)
+        return ico
+
+
+@_register_renderer
 class BaseAsciiRenderer(StreamRenderer):
     """
     Renders a board as a simple text table (without grid)
@@ -259,10 +416,21 @@ class BaseAsciiRenderer(StreamRenderer):
 
     def board_init(self, board=None):
         super(BaseAsciiRenderer, self).board_init(board)
-        LOG.info('init cells: %sx%s', self.full_width, self.full_width)
+        full_width, full_height = self.full_width, self.full_height
+        LOG.info('init cells: %sx%s', full_width, full_height)
+
+        # all the rows are stored one by one in a single flat list
+        self.row_size = full_width
+        self.cells = [Cell()] * (full_width * full_height)
 
-        self.cells = [[Cell()] * self.full_width
-                      for _ in range(self.full_height)]
+    def cell_rows(self):
+        """Split the flat list of cells into the rows"""
+        cells, row_size = self.cells, self.row_size
+        if not row_size:
+            return
+
+        for start in range(0, len(cells), row_size):
+            yield cells[start:start + row_size]
 
     def cell_icon(self, cell):
         """
@@ -272,62 +440,133 @@ class BaseAsciiRenderer(StreamRenderer):
         return cell.ascii_icon()
 
     def render(self):
-        for row in self.cells:
-            res = []
-            for index, cell in enumerate(row):
-                ico = self.cell_icon(cell)
+        cell_icon = _IconsTable(self.cell_icon).__getitem__
+        single_symbol = {1}
 
+        lines = []
+        for row in self.cell_rows():
+            icons = list(map(cell_icon, row))
+
+            # the most common case: every icon is a single symbol
+            if set(map(len, icons)) == single_symbol:
+                lines.append(' '.join(icons))
+                continue
+
+            last_index = len(icons) - 1
+            res = []
+            for index, ico in enumerate(icons):
                 # do not pad the last symbol in a line
                 if len(ico) == 1:
-                    if index < len(row) - 1:
+                    if index < last_index:
                         ico += ' '
 
                 res.append(ico)
 
-            self._print(''.join(res))
+            lines.append(''.join(res))
+
+        self._print_lines(lines)
 
     def draw_header(self):
-        for i in range(self.header_height):
-            for j in range(self.side_width):
-                self.cells[i][j] = ThumbnailCell()
+        cells, row_size = self.cells, self.row_size
+        header_height, side_width = self.header_height, self.side_width
+
+        # the thumbnail cells are read-only, so they can share a single instance
+        thumbnail_row = [ThumbnailCell()] * side_width
+        for i in range(header_height):
+            start = i * row_size
+            cells[start:start + side_width] = thumbnail_row
 
+        if not header_height:
+            return
+
+        header_size = header_height * row_size
+        blank_column = [Cell()] * header_height
         for j, col in enumerate(self.board.columns_descriptions):
-            rend_j = j + self.side_width
+            rend_j = j + side_width
             if not col:
                 col = [0]
 
-            rend_column = [ClueCell(val) for val in col]
-            rend_column = pad(rend_column, self.header_height, Cell())
-
-            # self.cells[:self.header_height, rend_j] = rend_column
-            for i, cell in enumerate(rend_column):
-                self.cells[i][rend_j] = cell
+            # every row_size-th cell of the header is in the same column;
+            # the clues are aligned to the bottom of the header
+            cells[rend_j:header_size:row_size] = blank_column
+            clue_start = rend_j + (header_height - len(col)) * row_size
+            cells[clue_start:header_size:row_size] = [ClueCell.get(val) for val in col]
 
     def draw_side(self):
+        row_size = self.row_size
+        header_height, side_width = self.header_height, self.side_width
+        if not side_width:
+            return
+
+        cells = self.cells
+        blank_row = [Cell()] * side_width
         for i, row in enumerate(self.board.rows_descriptions):
-            rend_i = i + self.header_height
+            start = (i + header_height) * row_size
+            end = start + side_width
             # row = list(row)
             if not row:
                 row = [0]
 
-            rend_row = [ClueCell(val) for val in row]
-            rend_row = pad(rend_row, self.side_width, Cell())
-            self.cells[rend_i][:self.side_width] = rend_row
+            # the clues are aligned to the right of the side
+            cells[start:end] = blank_row
+            cells[end - len(row):end] = [ClueCell.get(val) for val in row]
 
     def draw_grid(self, cells=None):
         if cells is None:
             cells = self.board.cells
 
         is_colored = self.is_colored
+        row_size = self.row_size
+        header_height, side_width = self.header_height, self.side_width
+
+        # the grid cells are read-only and there are only
+        # a few different values, so share a cell for every value
+        grid_cells = dict()
+
+        def _grid_cell(val):
+            cell = grid_cells.get(val)
+            if cell is None:
+                cell = grid_cells[val] = GridCell(val, self, colored=is_colored)
+            return cell
 
+        grid_width, total_size = row_size - side_width, len(self.cells)
         for i, row in enumerate(cells):
-            rend_i = i + self.header_height
-            for j, val in enumerate(row):
-                rend_j = j + self.side_width
-                self.cells[rend_i][rend_j] = GridCell(
-                    val, self, colored=is_colored)
+            start = (i + header_height) * row_size + side_width
+            rend_row = [_grid_cell(val) for val in row]
+
+            # the slice assignment would silently grow the list
+            end = start + len(rend_row)
+            if len(rend_row) > grid_width or end > total_size:
+                raise IndexError('The row {} does not fit into the grid'.format(i))
+
+            self.cells[start:end] = rend_row
+
+
+@memoized
+def _pad_icon(ico, max_width):
+    """
+    Center the icon in the cell of given width.
+    The number of different icons is small, so remember all of them.
+    """
+    padded = max_width - len(ico)
+    if padded < 0:
+        raise ValueError('Cannot fit the value {} into cell width {}'.format(
+            ico, max_width))
+
+    # pre-formatted to pad later
+    res = '{}%s{}' % ico
+
+    space_padding = ' ' * int(padded / 2)
+
+    # e.g. 3 --> ' 3 '
+    # but 13 --> ' 13'
+    if padded % 2 == 0:
+        return res.format(space_padding, space_padding)
+
+    return res.format(space_padding + ' ', space_padding)
 
 
+@_register_renderer
 class AsciiRenderer(BaseAsciiRenderer):
     """
     Renders the board as a full-blown ASCII table
@@ -387,12 +626,16 @@ class AsciiRenderer(BaseAsciiRenderer):
         else:
             bold_cross_symbol = self.BOLD_LINE_VERTICAL_SIZE * self.GRID_CROSS_SYMBOL
 
-        return bold_cross_symbol.join(
-            self.GRID_CROSS_SYMBOL.join(block)
-            for block in
-            split_seq(
-                [self._cell_horizontal_border(header=header, bold=bold)] * size,
-                self.BOLD_LINE_EVERY))
+        cell_border = self._cell_horizontal_border(header=header, bold=bold)
+        cross_symbol = self.GRID_CROSS_SYMBOL
+
+        # all the full blocks between the bold lines are the same
+        full_blocks, tail_size = divmod(size, self.BOLD_LINE_EVERY)
+        blocks = [cross_symbol.join([cell_border] * self.BOLD_LINE_EVERY)] * full_blocks
+        if tail_size:
+            blocks.append(cross_symbol.join([cell_border] * tail_size))
+
+        return bold_cross_symbol.join(blocks)
 
     def _grid_row(self, border=False, header=False, data_row_index=None):
         """
@@ -424,57 +667,72 @@ class AsciiRenderer(BaseAsciiRenderer):
     # not a class method to enable live reloading of CELL_WIDTH
     def cell_icon(self, cell):
         ico = super(AsciiRenderer, self).cell_icon(cell)
-        max_width = self.CELL_WIDTH
-        padded = max_width - len(ico)
-        if padded < 0:
-            raise ValueError('Cannot fit the value {} into cell width {}'.format(
-                ico, max_width))
-
-        # pre-formatted to pad later
-        res = '{}%s{}' % ico
-
-        space_padding = ' ' * int(padded / 2)
-
-        # e.g. 3 --> ' 3 '
-        # but 13 --> ' 13'
-        if padded % 2 == 0:
-            return res.format(space_padding, space_padding)
-
-        return res.format(space_padding + ' ', space_padding)
+        return _pad_icon(ico, self.CELL_WIDTH)
 
-    def _value_row(self, values):
+    def _value_separators(self, size):
+        """
+        The separators to put before each of the `size` cells in a row
+        and the final one after the last cell
+        """
         sep = self.VERTICAL_GRID_SYMBOL
         bold_sep = self.BOLD_LINE_VERTICAL_SIZE * sep
+        side_width = self.side_width
+        bold_every = self.BOLD_LINE_EVERY
 
-        for i, cell in enumerate(values):
-            if i == self.side_width:
-                yield self._side_delimiter()
+        separators = []
+        for i in range(size):
+            if i == side_width:
+                separators.append(self._side_delimiter())
             else:
                 # only on a data area, every 5 column
-                if i > self.side_width and \
-                        (i - self.side_width) % self.BOLD_LINE_EVERY == 0:
-                    yield bold_sep
+                if i > side_width and (i - side_width) % bold_every == 0:
+                    separators.append(bold_sep)
                 else:
-                    yield sep
+                    separators.append(sep)
+
+        separators.append(sep)
+        return separators
 
-            yield self.cell_icon(cell)
+    def _value_row(self, values, cell_icon=None, separators=None):
+        if cell_icon is None:
+            cell_icon = self.cell_icon
+        if separators is None:
+            separators = self._value_separators(len(values))
 
-        yield sep
+        # separators on the even positions, icons on the odd ones
+        return ''.join(interleave(separators, list(map(cell_icon, values))))
 
     def render(self):
-        for i, row in enumerate(self.cells):
+        # there are only a few different grid rows, so build them once
+        border_row = self._grid_row(border=True)
+        header_row = self._grid_row(header=True)
+        plain_row = self._grid_row()
+        bold_row = self._grid_row(data_row_index=self.BOLD_LINE_EVERY)
+
+        header_height = self.header_height
+        bold_every = self.BOLD_LINE_EVERY
+        cell_icon = _IconsTable(self.cell_icon).__getitem__
+        # all the rows have the same structure
+        separators = self._value_separators(self.row_size)
+
+        lines = []
+        for i, row in enumerate(self.cell_rows()):
             if i == 0:
-                grid_row = self._grid_row(border=True)
-            elif i == self.header_height:
-                grid_row = self._grid_row(header=True)
+                grid_row = border_row
+            elif i == header_height:
+                grid_row = header_row
+            elif i > header_height and (i - header_height) % bold_every == 0:
+                grid_row = bold_row
             else:
-                grid_row = self._grid_row(data_row_index=i - self.header_height)
-            self._print(grid_row)
-            self._print(''.join(self._value_row(row)))
+                grid_row = plain_row
+            lines.append(grid_row)
+            lines.append(self._value_row(row, cell_icon, separators))
 
-        self._print(self._grid_row(border=True))
+        lines.append(border_row)
+        self._print_lines(lines)
 
 
+@_register_renderer
 class AsciiRendererWithBold(AsciiRenderer):
     """
     AsciiRenderer that also splits the whole board into
@@ -488,6 +746,7 @@ class AsciiRendererWithBold(AsciiRenderer):
     BOLD_LINE_VERTICAL_SIZE = 2
 
 
+@_register_renderer
 class SvgRenderer(StreamRenderer):
     """
     Draws the board like an SVG image (best representation for web)
@@ -501,6 +760,8 @@ class SvgRenderer(StreamRenderer):
     GRID_STROKE_WIDTH = 1
     GRID_BOLD_STROKE_WIDTH = 2
 
+    _BLACK_COLOR_ID = Color.black().id_
+
     @property
     def clues_font_size(self):
         """The size of the descriptions text"""
@@ -514,6 +775,8 @@ class SvgRenderer(StreamRenderer):
 
         self.cell_size = size
         self.color_symbols = dict()
+        self._static_elements = dict()
+        self._grid_groups = None
         self.drawing = Drawing(size=(
             self.full_width + self.cell_size,
             self.full_height + self.cell_size))
@@ -562,6 +825,8 @@ class SvgRenderer(StreamRenderer):
         ))
 
         self._add_colors_def()
+        # the mixed colors symbols are defined later on demand
+        self._basic_symbols = tuple(self.color_symbols)
 
         self._add_symbol(
             'check', None,
@@ -585,22 +850,6 @@ class SvgRenderer(StreamRenderer):
         cell_size = self.cell_size
         rect_size = (cell_size, cell_size)
 
-        upper_triangle_points = ((0, 0), (0, cell_size), (cell_size, 0))
-        lower_triangle_points = ((0, cell_size), (cell_size, 0), (cell_size, cell_size))
-
-        # three_colored_flag_rect_size = (cell_size / 3, cell_size)
-        # three_colored_flag_insert_points = [(0, 0), (cell_size / 3, 0), (2 * cell_size / 3, 0)]
-        three_color_triangle_size = round(cell_size * ((1 / 2) ** 0.5), 2)
-        three_color_triangle_coord = round(cell_size - three_color_triangle_size, 2)
-
-        three_colors_upper_points = [
-            (0, 0), (0, three_color_triangle_size), (three_color_triangle_size, 0)]
-        three_colors_lower_points = [
-            (cell_size, three_color_triangle_coord),
-            (three_color_triangle_coord, cell_size),
-            (cell_size, cell_size),
-        ]
-
         # rendering should be predictable
         colors = []
         if self.is_colored:
@@ -621,63 +870,6 @@ class SvgRenderer(StreamRenderer):
                         fill=fill_color,
                     ))
 
-        if self.is_colored:
-            for (color_name, fill_color), (color_name2, fill_color2) in combinations(colors, 2):
-                LOG.info('Transient symbol: %s, %s + %s, %s',
-                         color_name, fill_color, color_name2, fill_color2)
-                color_tuple = (color_name, color_name2)
-
-                self._add_symbol(
-                    'x2-%s' % '-'.join(map(str, color_tuple)), color_tuple,
-                    drawing.polygon(
-                        points=upper_triangle_points,
-                        fill=fill_color,
-                    ),
-                    drawing.polygon(
-                        points=lower_triangle_points,
-                        fill=fill_color2,
-                    ),
-                )
-
-            for (color_name, fill_color), (color_name2, fill_color2), (
-                    color_name3, fill_color3) in combinations(colors, 3):
-                LOG.info('Transient symbol: %s, %s + %s, %s + %s, %s',
-                         color_name, fill_color,
-                         color_name2, fill_color2,
-                         color_name3, fill_color3)
-                color_tuple = (color_name, color_name2, color_name3)
-
-                self._add_symbol(
-                    'x3-%s' % '-'.join(map(str, color_tuple)), color_tuple,
-                    # drawing.rect(
-                    #     insert=three_colored_flag_insert_points[0],
-                    #     size=three_colored_flag_rect_size,
-                    #     fill=fill_color,
-                    # ),
-                    # drawing.rect(
-                    #     insert=three_colored_flag_insert_points[1],
-                    #     size=three_colored_flag_rect_size,
-                    #     fill=fill_color2,
-                    # ),
-                    # drawing.rect(
-                    #     insert=three_colored_flag_insert_points[2],
-                    #     size=three_colored_flag_rect_size,
-                    #     fill=fill_color3,
-                    # ),
-                    drawing.rect(
-                        size=rect_size,
-                        fill=fill_color,
-                    ),
-                    drawing.polygon(
-                        points=three_colors_upper_points,
-                        fill=fill_color2,
-                    ),
-                    drawing.polygon(
-                        points=three_colors_lower_points,
-                        fill=fill_color3,
-                    ),
-                )
-
         # it's a little circle
         self._add_symbol(
             'space', space_color,
@@ -685,6 +877,77 @@ class SvgRenderer(StreamRenderer):
                 r=cell_size / 10
             ))
 
+    def _add_mixed_colors_def(self, cell):
+        """
+        Define the symbol for the cell of two or three colors.
+
+        The number of such combinations grows fast with the number of colors,
+        so define only the ones that really appear on the board.
+        """
+        drawing = self.drawing
+        color_map = self.board.color_map
+
+        # rendering should be predictable
+        color_tuple = tuple(sorted(
+            color_map.find_by_id(color_id).name
+            for color_id in two_powers(cell)))
+        fill_colors = [self._color_from_name(color_name)
+                       for color_name in color_tuple]
+
+        LOG.info('Transient symbol: %s',
+                 ' + '.join('%s, %s' % pair for pair in zip(color_tuple, fill_colors)))
+
+        cell_size = self.cell_size
+
+        if len(color_tuple) == 2:
+            upper_triangle_points = ((0, 0), (0, cell_size), (cell_size, 0))
+            lower_triangle_points = ((0, cell_size), (cell_size, 0), (cell_size, cell_size))
+
+            self._add_symbol(
+                'x2-%s' % '-'.join(map(str, color_tuple)), color_tuple,
+                drawing.polygon(
+                    points=upper_triangle_points,
+                    fill=fill_colors[0],
+                ),
+                drawing.polygon(
+                    points=lower_triangle_points,
+                    fill=fill_colors[1],
+                ),
+            )
+
+        else:
+            # three_colored_flag_rect_size = (cell_size / 3, cell_size)
+            # three_colored_flag_insert_points = [
+            #     (0, 0), (cell_size / 3, 0), (2 * cell_size / 3, 0)]
+            three_color_triangle_size = round(cell_size * ((1 / 2) ** 0.5), 2)
+            three_color_triangle_coord = round(cell_size - three_color_triangle_size, 2)
+
+            three_colors_upper_points = [
+                (0, 0), (0, three_color_triangle_size), (three_color_triangle_size, 0)]
+            three_colors_lower_points = [
+                (cell_size, three_color_triangle_coord),
+                (three_color_triangle_coord, cell_size),
+                (cell_size, cell_size),
+            ]
+
+            self._add_symbol(
+                'x3-%s' % '-'.join(map(str, color_tuple)), color_tuple,
+                drawing.rect(
+                    size=(cell_size, cell_size),
+                    fill=fill_colors[0],
+                ),
+                drawing.polygon(
+                    points=three_colors_upper_points,
+                    fill=fill_colors[1],
+                ),
+                drawing.polygon(
+                    points=three_colors_lower_points,
+                    fill=fill_colors[2],
+                ),
+            )
+
+        return self.color_symbols[cell]
+
     @property
     def pixel_side_width(self):
         """Horizontal clues side width in pixels"""
@@ -734,6 +997,9 @@ class SvgRenderer(StreamRenderer):
         else:
             color_id = None
 
+        cell_size = self.cell_size
+        pixel_side_width, pixel_header_height = self.pixel_side_width, self.pixel_header_height
+
         block_color = None
         if color_id is not None:
             id_ = self.color_symbols[color_id]
@@ -745,13 +1011,13 @@ class SvgRenderer(StreamRenderer):
 
             # drawing.g(class_=id_)
             insert_point = (
-                self.pixel_side_width + (color_box[0] * self.cell_size),
-                self.pixel_header_height + (color_box[1] * self.cell_size))
+                pixel_side_width + (color_box[0] * cell_size),
+                pixel_header_height + (color_box[1] * cell_size))
 
             block_color = (id_, insert_point)
 
         extra = dict()
-        if color_id == Color.black().id_:
+        if color_id == self._BLACK_COLOR_ID:
             extra['fill'] = 'white'
 
         if value == BlottedBlock:
@@ -762,8 +1028,8 @@ class SvgRenderer(StreamRenderer):
         block_text = self.drawing.text(
             text_value,
             insert=(
-                self.pixel_side_width + (i + shift[0]) * self.cell_size,
-                self.pixel_header_height + (j + shift[1]) * self.cell_size,
+                pixel_side_width + (i + shift[0]) * cell_size,
+                pixel_header_height + (j + shift[1]) * cell_size,
             ),
             **extra
         )
@@ -773,26 +1039,31 @@ class SvgRenderer(StreamRenderer):
     def draw_header(self):
         drawing = self.drawing
 
-        drawing.add(drawing.rect(
+        drawing.add(self._static_element('thumbnail', lambda: drawing.rect(
             size=(self.pixel_side_width, self.pixel_header_height),
-            class_='nonogram-thumbnail'))
-        drawing.add(drawing.rect(
+            class_='nonogram-thumbnail')))
+        drawing.add(self._static_element('header', lambda: drawing.rect(
             insert=(self.pixel_side_width, 0),
             size=(self.pixel_board_width, self.pixel_header_height),
-            class_='nonogram-header'))
+            class_='nonogram-header')))
+
+        board = self.board
+        block_svg = self.block_svg
+        cell_size = self.cell_size
+        pixel_side_width, pixel_header_height = self.pixel_side_width, self.pixel_header_height
 
         header_group = drawing.g(class_='header-clues')
-        for i, col_desc in enumerate(self.board.columns_descriptions):
-            if self.board.column_solution_rate(i) == 1:
-                x_pos = self.pixel_side_width + (i * self.cell_size)
+        for i, col_desc in enumerate(board.columns_descriptions):
+            if board.column_solution_rate(i) == 1:
+                x_pos = pixel_side_width + (i * cell_size)
                 header_group.add(drawing.rect(
                     insert=(x_pos, 0),
-                    size=(self.cell_size, self.pixel_header_height),
+                    size=(cell_size, pixel_header_height),
                     class_='solved'
                 ))
 
             for j, desc_item in enumerate(reversed(col_desc)):
-                color, text = self.block_svg(desc_item, True, i, j)
+                color, text = block_svg(desc_item, True, i, j)
 
                 # color first, text next (to write on color)
                 if color:
@@ -811,23 +1082,28 @@ class SvgRenderer(StreamRenderer):
     def draw_side(self):
         drawing = self.drawing
 
-        drawing.add(drawing.rect(
+        drawing.add(self._static_element('side', lambda: drawing.rect(
             insert=(0, self.pixel_header_height),
             size=(self.pixel_side_width, self.pixel_board_height),
-            class_='nonogram-side'))
+            class_='nonogram-side')))
+
+        board = self.board
+        block_svg = self.block_svg
+        cell_size = self.cell_size
+        pixel_side_width, pixel_header_height = self.pixel_side_width, self.pixel_header_height
 
         side_group = drawing.g(class_='side-clues')
-        for j, row_desc in enumerate(self.board.rows_descriptions):
-            if self.board.row_solution_rate(j) == 1:
-                y_pos = self.pixel_header_height + (j * self.cell_size)
+        for j, row_desc in enumerate(board.rows_descriptions):
+            if board.row_solution_rate(j) == 1:
+                y_pos = pixel_header_height + (j * cell_size)
                 side_group.add(drawing.rect(
                     insert=(0, y_pos),
-                    size=(self.pixel_side_width, self.cell_size),
+                    size=(pixel_side_width, cell_size),
                     class_='solved'
                 ))
 
             for i, desc_item in enumerate(reversed(row_desc)):
-                color, text = self.block_svg(desc_item, False, j, i)
+                color, text = block_svg(desc_item, False, j, i)
 
                 # color first, text next (to write on color)
                 if color:
@@ -843,9 +1119,24 @@ class SvgRenderer(StreamRenderer):
 
         drawing.add(side_group)
 
-        if self.board.is_solved_full:
+        if board.is_solved_full:
             self._insert_solved_symbol()
 
+    def _static_element(self, name, factory):
+        """
+        The element that depends only on the sizes of the board
+        gets created once and then reused on every draw
+        (until the board changes its sizes, e.g. when reduced).
+        """
+        sizes = (self.board.width, self.board.height,
+                 self.header_height, self.side_width)
+
+        cached = self._static_elements.get(name)
+        if cached is None or cached[0] != sizes:
+            cached = self._static_elements[name] = (sizes, factory())
+
+        return cached[1]
+
     def _insert_solved_symbol(self):
         drawing = self.drawing
 
@@ -855,9 +1146,8 @@ class SvgRenderer(StreamRenderer):
         left_padding = max(left_padding, 0)
         top_padding = max(top_padding, 0)
 
-        drawing.add(drawing.use('#check', insert=(
-            left_padding, top_padding
-        )))
+        drawing.add(self._static_element('check', lambda: drawing.use(
+            '#check', insert=(left_padding, top_padding))))
 
     @classmethod
     def _color_code(cls, cell):
@@ -875,85 +1165,112 @@ class SvgRenderer(StreamRenderer):
 
         drawing = self.drawing
 
-        drawing.add(drawing.rect(
+        drawing.add(self._static_element('grid', lambda: drawing.rect(
             insert=(self.pixel_side_width, self.pixel_header_height),
             size=(self.pixel_board_width, self.pixel_board_height),
-            class_='nonogram-grid'))
+            class_='nonogram-grid')))
+
+        # when solving, the board is often redrawn without any changes
+        cells_snapshot = tuple(map(tuple, cells))
+        cached = self._grid_groups
+        if cached is not None and cached[0] == cells_snapshot:
+            groups = cached[1]
+        else:
+            groups = self._get_grid_groups(cells)
+            self._grid_groups = (cells_snapshot, groups)
+
+        for group in groups:
+            drawing.add(group)
+
+        # write grid on top of the colors
+        self._insert_grid_lines()
 
+    def _get_grid_groups(self, cells):
+        """
+        Group the cells by their symbols.
+        Return the groups in a predictable order.
+        """
+        color_symbols = self.color_symbols
         cell_groups = dict()
-        for cell_value, id_ in iteritems(self.color_symbols):
-            cell_groups[cell_value] = drawing.g(class_=id_)
+        for cell_value in self._basic_symbols:
+            cell_groups[cell_value] = _UseGroup(color_symbols[cell_value])
 
         space_cell = SPACE_COLORED if self.is_colored else SPACE
 
+        # there are only a few different values on the board
+        color_code = self._color_code
+        color_codes = dict()
+
+        # the coordinates of the cells (and of their centers) in pixels
+        cell_size = self.cell_size
+        pixel_side_width, pixel_header_height = self.pixel_side_width, self.pixel_header_height
+        columns, rows = range(self.board.width), range(self.board.height)
+        x_positions = [pixel_side_width + (i * cell_size) for i in columns]
+        y_positions = [pixel_header_height + (j * cell_size) for j in rows]
+        x_centers = [pixel_side_width + (i + 0.5) * cell_size for i in columns]
+        y_centers = [pixel_header_height + (j + 0.5) * cell_size for j in rows]
+
         for j, row in enumerate(cells):
             for i, cell in enumerate(row):
-                cell = self._color_code(cell)
+                code = color_codes.get(cell)
+                if code is None and cell not in color_codes:
+                    code = color_codes[cell] = color_code(cell)
+                cell = code
 
                 if cell == UNKNOWN:
                     continue
 
                 if cell == space_cell:
-                    insert_point = (
-                        self.pixel_side_width + (i + 0.5) * self.cell_size,
-                        self.pixel_header_height + (j + 0.5) * self.cell_size)
+                    insert_point = (x_centers[i], y_centers[j])
                 else:
                     # for boxes colored and black
-                    insert_point = (
-                        self.pixel_side_width + (i * self.cell_size),
-                        self.pixel_header_height + (j * self.cell_size))
+                    insert_point = (x_positions[i], y_positions[j])
 
-                id_ = self.color_symbols[cell]
-                icon = drawing.use(
-                    href='#' + id_,
-                    insert=insert_point)
-                cell_groups[cell].add(icon)
+                id_ = color_symbols.get(cell)
+                if id_ is None:
+                    id_ = self._add_mixed_colors_def(cell)
 
-        # to get predictable order
-        for cell_value, group in sorted(iteritems(cell_groups),
-                                        key=lambda x: x[0]):
-            drawing.add(group)
-
-        # write grid on top of the colors
-        self._insert_grid_lines()
+                group = cell_groups.get(cell)
+                if group is None:
+                    group = cell_groups[cell] = _UseGroup(id_)
 
-    def _insert_grid_lines(self):
-        drawing = self.drawing
+                group.insert_points.append(insert_point)
 
-        grid_lines = drawing.g(class_='grid-lines')
-        for line in self._get_grid_lines():
-            grid_lines.add(line)
+        # to get predictable order
+        return [group for cell_value, group in sorted(iteritems(cell_groups),
+                                                      key=lambda x: x[0])]
 
-        drawing.add(grid_lines)
+    def _insert_grid_lines(self):
+        self.drawing.add(self._static_element('grid-lines', lambda: _LinesGroup(
+            'grid-lines', list(self._get_grid_lines()))))
 
     def _get_grid_lines(self):
-        drawing = self.drawing
+        """
+        Generate the (start, end, class) triples for all the grid lines
+        """
+        height, width = self.board.height, self.board.width
+        cell_size = self.cell_size
+        bold_every = self.BOLD_EVERY
 
         # draw horizontal lines
-        for i in range(self.board.height + 1):
-            extra = dict()
-
-            if i % self.BOLD_EVERY == 0 or i == self.board.height:
-                extra['class'] = 'bold'
+        pixel_header_height, full_width = self.pixel_header_height, self.full_width
+        for i in range(height + 1):
+            line_class = None
+            if i % bold_every == 0 or i == height:
+                line_class = 'bold'
 
-            y_pos = self.pixel_header_height + (i * self.cell_size)
-            yield drawing.line(
-                start=(0, y_pos),
-                end=(self.full_width, y_pos),
-                **extra)
+            y_pos = pixel_header_height + (i * cell_size)
+            yield (0, y_pos), (full_width, y_pos), line_class
 
         # draw vertical lines
-        for i in range(self.board.width + 1):
-            extra = dict()
+        pixel_side_width, full_height = self.pixel_side_width, self.full_height
+        for i in range(width + 1):
+            line_class = None
+            if i % bold_every == 0 or i == width:
+                line_class = 'bold'
 
-            if i % self.BOLD_EVERY == 0 or i == self.board.width:
-                extra['class'] = 'bold'
-
-            x_pos = self.pixel_side_width + (i * self.cell_size)
-            yield drawing.line(
-                start=(x_pos, 0),
-                end=(x_pos, self.full_height),
-                **extra)
+            x_pos = pixel_side_width + (i * cell_size)
+            yield (x_pos, 0), (x_pos, full_height), line_class
 
     def render(self):
         self.drawing.write(self.stream)
@@ -964,15 +1281,3 @@ class SvgRenderer(StreamRenderer):
         self.drawing.add(self.drawing.defs)
 
         super(SvgRenderer, self).draw(cells=cells)
-
-
-def _register_renderers():
-    res = dict()
-    for obj in itervalues(globals()):
-        if isinstance(obj, type):
-            if issubclass(obj, StreamRenderer) and hasattr(obj, '__rend_name__'):
-                res[obj.__rend_name__] = obj
-    return res
-
-
-RENDERERS = _register_renderers()
@@ -8,17 +8,24 @@ from __future__ import unicode_literals, print_function
 import json
 import os
 import re
+import string
+from collections import OrderedDict
 from contextlib import closing
+from functools import partial
+from io import BytesIO
+from tempfile import NamedTemporaryFile
 from xml.etree import ElementTree
 
+from memoized import memoized
 from six import (
     string_types, binary_type,
+    iteritems,
     PY2,
 )
 from six.moves import range
 # I don't want interpolation features, so RawConfigParser (not ConfigParser)
 # noinspection PyUnresolvedReferences
-from six.moves.configparser import RawConfigParser
+from six.moves.configparser import RawConfigParser, DEFAULTSECT
 from six.moves.urllib.error import HTTPError
 from six.moves.urllib.request import urlopen
 
@@ -31,13 +38,30 @@ from pynogram.core.common import (
     clues,
     BlottedBlock,
 )
-from pynogram.utils.iter import expand_generator
+from pynogram.utils.cache import Cache
+from pynogram.utils.other import get_named_logger
+
+LOG = get_named_logger(__name__, __file__)
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 _INLINE_COMMENT_PREFIXES = '#;'
 
 
+def _inline_comment_re(prefixes):
+    """
+    Match the comment starting with any of the prefixes
+    in the beginning of a line or after a space
+    """
+    return re.compile(r'(?:^|\s)[{}].*$'.format(re.escape(prefixes)))
+
+
+_INLINE_COMMENT_RE = _inline_comment_re(_INLINE_COMMENT_PREFIXES)
+
+# the spaces and quotes around a single description
+_DESCRIPTION_JUNK = string.whitespace + '\'"'
+
+
 def parse_line(description, inline_comments=_INLINE_COMMENT_PREFIXES):
     """
     Parse a line and correctly add the description(s) to a collection
@@ -49,22 +73,22 @@ def parse_line(description, inline_comments=_INLINE_COMMENT_PREFIXES):
     #
     # PY3 can do it for you with 'inline_comment_prefixes' = '#;'
     if PY2:
-        for comment_prefix in inline_comments:
-            pos = description.find(comment_prefix)
-            if pos != -1:
-                # comment line or inline comment (after a space)
-                if pos == 0 or description[pos - 1].isspace():
-                    description = description[:pos]
-
-        if not description:
-            return None
+        if inline_comments == _INLINE_COMMENT_PREFIXES:
+            comment_re = _INLINE_COMMENT_RE
+        else:
+            comment_re = _inline_comment_re(inline_comments)
+
+        # comment line or inline comment (after a space)
+        description = comment_re.sub('', description)
+
+    if not description or description.isspace():
+        return None
 
     # there can be trailing commas if you copy from source code
     descriptions = description.strip(',').split(',')
 
     # strip all the spaces and quotes
-    descriptions = [desc.strip().strip("'").strip('"').strip() for desc in descriptions]
-    return descriptions
+    return [desc.strip(_DESCRIPTION_JUNK) for desc in descriptions]
 
 
 def example_file(file_name=''):
@@ -78,16 +102,32 @@ def example_file(file_name=''):
     if os.path.isfile(file_name):
         return file_name
 
-    file_name = os.path.join(examples_dir, file_name)
-    if os.path.isfile(file_name):
-        return file_name
-
-    txt_file_name = file_name + '.txt'
-    if os.path.isfile(txt_file_name):
-        return txt_file_name
+    for name in (file_name, file_name + '.txt'):
+        if _is_example(examples_dir, name):
+            return os.path.join(examples_dir, name)
 
     # just return the original file name, don't know where is it
-    return file_name
+    return os.path.join(examples_dir, file_name)
+
+
+def _is_example(examples_dir, name):
+    """Whether the file exists in the examples directory"""
+    if os.path.dirname(name):
+        return os.path.isfile(os.path.join(examples_dir, name))
+
+    # do not touch the disk for every known name,
+    # but still find the files added after the directory was listed
+    if name in _example_names(examples_dir):
+        return True
+    return os.path.isfile(os.path.join(examples_dir, name))
+
+
+@memoized
+def _example_names(examples_dir):
+    """The file names found in the examples directory on the first call"""
+    return frozenset(
+        name for name in os.listdir(examples_dir)
+        if os.path.isfile(os.path.join(examples_dir, name)))
 
 
 def read_example(board_file):
@@ -129,24 +169,156 @@ class MultiLineConfigParser(RawConfigParser, object):
         return [x.strip() for x in value.splitlines() if x]
 
 
-_COLOR_RE = re.compile(r'\((.+)\) (.+)')
+class FastIniParser(object):
+    """
+    Lightweight parser for the nonogram INI-files.
+
+    Understands the same syntax as the `MultiLineConfigParser` does in PY3
+    (sections, multi-line values, full-line and inline comments)
+    in a single pass over the lines. Everything else
+    (duplicates, DEFAULT section, malformed lines)
+    is left for the full-featured parser.
+    """
+
+    SECTION_RE = RawConfigParser.SECTCRE
+    OPTION_RE = RawConfigParser.OPTCRE
+
+    def __init__(self):
+        self._sections = OrderedDict()
+
+    @classmethod
+    def parse(cls, lines):
+        """
+        Return the parser filled with the given lines
+        or None if they cannot be parsed by the simple rules
+        """
+        parser = cls()
+        sections = parser._sections
+
+        options = values = None
+        indent_level = 0
+        for line in lines:
+            value = _INLINE_COMMENT_RE.sub('', line).strip()
+            if not value:
+                if values is not None and not line.strip():
+                    # an empty line (not a comment) is a part of the value
+                    values.append(value)
+                continue
+
+            cur_indent_level = len(line) - len(line.lstrip())
+            if values is not None and cur_indent_level > indent_level:
+                # continuation of the multi-line value
+                values.append(value)
+                continue
+
+            indent_level = cur_indent_level
+
+            match = cls.SECTION_RE.match(value)
+            if match:
+                name = match.group('header')
+                if name in sections or name == DEFAULTSECT:
+                    return None
+
+                options = sections[name] = OrderedDict()
+                values = None
+                continue
+
+            match = cls.OPTION_RE.match(value) if options is not None else None
+            if not match:
+                return None
+
+            name = match.group('option').rstrip().lower()
+            if not name or name in options:
+                return None
+
+            values = options[name] = [match.group('value').strip()]
+
+        return parser
+
+    def has_section(self, section):
+        """Whether the section is present"""
+        return section in self._sections
+
+    def has_option(self, section, option):
+        """Whether the option is present in the section"""
+        return option in self._sections.get(section, ())
+
+    def get_list(self, section, option):
+        """All the non-empty lines of the value"""
+        return [x for x in self._sections[section][option] if x]
+
+    def items(self, section):
+        """The (option, value) pairs of the section"""
+        return [(option, '\n'.join(values).rstrip())
+                for option, values in iteritems(self._sections[section])]
+
+
+def _parse_color(color_desc):
+    """
+    Split the color definition '(<COLOR_DESC>) <ASCII CHARACTER>'
+    into the pair (COLOR_DESC, ASCII CHARACTER)
+    """
+    head, sep, symbol = color_desc.rpartition(') ')
+    if not (sep and symbol and len(head) > 1 and head.startswith('(')):
+        raise ValueError('Bad color definition: {!r}'.format(color_desc))
+
+    return head[1:], symbol
 
 
 def read_ini(content):
-    """Return the board definition from an INI-file"""
+    """
+    Return the board definition from an INI-file.
 
-    parser = MultiLineConfigParser()
+    The definition of a file (given by its name) is cached and shared
+    between the callers, so do not modify it (e.g. the color map).
+    """
 
     if isinstance(content, string_types):
-        content = open(content)
+        # the same file can be read many times, so parse it only once
+        # (while it is not modified)
+        return _read_ini_file(content)
+
+    return _read_ini(content)
+
+
+_INI_FILES_CACHE = Cache(max_size=128)
+
+
+def _read_ini_file(file_name):
+    """
+    Parse the INI-file by its name.
+    The result is cached until the file's modification time or size changes.
+    """
+    stat = os.stat(file_name)
+    # the nanoseconds are not available in PY2
+    key = (os.path.abspath(file_name), getattr(stat, 'st_mtime_ns', stat.st_mtime), stat.st_size)
+
+    definition = _INI_FILES_CACHE.get(key)
+    if definition is None:
+        with open(file_name) as content:
+            definition = _read_ini(content)
+        _INI_FILES_CACHE.save(key, definition)
+
+    return definition
+
+
+def _read_ini(content):
+    """Return the board definition from an opened INI-file"""
 
     if PY2:
+        parser = MultiLineConfigParser()
         # it's not deprecated for python2
         # noinspection PyDeprecation
         parser.readfp(content)  # pylint: disable=deprecated-method
     else:
-        # readfp is deprecated in future versions
-        parser.read_file(content)
+        text = content.read()
+        parser = FastIniParser.parse(text.splitlines())
+
+        if parser is None or not (parser.has_option('clues', 'columns') and
+                                  parser.has_option('clues', 'rows')):
+            # let the full-featured parser deal with it (or report an error)
+            parser = MultiLineConfigParser()
+            parser.read_string(text, source=getattr(content, 'name', '<string>'))
 
     columns = []
     for col in parser.get_list('clues', 'columns'):
@@ -160,15 +332,12 @@ def read_ini(content):
         if row is not None:
             rows.extend(row)
 
-    res = [columns, rows]
+    res = [tuple(columns), tuple(rows)]
 
     if parser.has_section('colors'):
         colors = ColorMap()
         for color_name, color_desc in parser.items('colors'):
-            match = _COLOR_RE.match(color_desc)
-            # TODO: spit some info if not matched
-
-            colors.make_color(color_name, *match.groups())
+            colors.make_color(color_name, *_parse_color(color_desc))
 
         if not colors.black_and_white:
             res.append(colors)
@@ -180,62 +349,158 @@ class PbnNotFoundError(Exception):
     """Raised when trying to reach webpbn puzzle by non-existing id"""
 
 
+# atomic (when on the same file system) and overwrites the destination
+# noinspection PyUnresolvedReferences
+_replace_file = getattr(os, 'replace', os.rename)
+
+
+# The structure of the document is fixed (see http://webpbn.com/pbn_fmt.html):
+# <puzzleset> --> <puzzle> --> (<color>, <clues> --> <line> --> <count>)
+_PBN_COUNT_TAG = 'count'
+
+
+def _parse_clue(clue, default_color=None):
+    """The blocks of a single webpbn <line> (the zero size means a blotted block)"""
+    if default_color:
+        return tuple(
+            (int(block.text) or BlottedBlock, block.attrib.get('color', default_color))
+            for block in clue if block.tag == _PBN_COUNT_TAG)
+
+    return tuple(
+        int(block.text) or BlottedBlock
+        for block in clue if block.tag == _PBN_COUNT_TAG)
+
+
 class Pbn(object):
     """Grab the examples from http://webpbn.com/"""
 
     BASE_URL = 'http://webpbn.com'
 
+    # the downloaded puzzles are saved here to not fetch them again
+    # (the caching is disabled by default)
+    CACHE_DIR = os.environ.get('PYNOGRAM_PBN_CACHE_DIR') or None
+
+    @classmethod
+    def _cache_path(cls, _id):
+        if not cls.CACHE_DIR:
+            return None
+
+        return os.path.join(cls.CACHE_DIR, '{}.xml'.format(_id))
+
     @classmethod
     def get_puzzle_xml(cls, _id):
         """Return the file-like object with puzzle definition in XML format"""
 
+        cache_path = cls._cache_path(_id)
+        if cache_path and os.path.isfile(cache_path):
+            with open(cache_path, 'rb') as cache_file:
+                return BytesIO(cache_file.read())
+
         # noinspection SpellCheckingInspection
         url = '{}/XMLpuz.cgi?id={}'.format(cls.BASE_URL, _id)
-        return urlopen(url)
+        with closing(urlopen(url)) as response:
+            data = response.read()
+
+        # do not save the error messages for absent puzzles
+        if cache_path and b'<puzzleset' in data:
+            cls._save_to_cache(cache_path, data)
+
+        return BytesIO(data)
 
     @classmethod
-    @expand_generator(type_=tuple)
-    def _parse_clue(cls, clue, default_color=None):
-        for block in clue.findall('count'):
-            size = int(block.text)
-            if size == 0:
-                size = BlottedBlock
-
-            if default_color:
-                yield size, block.attrib.get('color', default_color)
-            else:
-                yield size
+    def _save_to_cache(cls, cache_path, data):
+        """
+        Write the puzzle into a temporary file and then move it into place,
+        so an interrupted write never leaves a truncated puzzle in the cache
+        """
+        try:
+            if not os.path.isdir(cls.CACHE_DIR):
+                os.makedirs(cls.CACHE_DIR)
+
+            with NamedTemporaryFile(dir=cls.CACHE_DIR, suffix='.tmp', delete=False) as tmp_file:
+                tmp_file.write(data)
+
+            try:
+                _replace_file(tmp_file.name, cache_path)
+            except OSError:
+                os.remove(tmp_file.name)
+                raise
+        except (OSError, IOError) as exc:
+            LOG.warning('Cannot cache the puzzle into %r: %s', cache_path, exc)
+
+    @classmethod
+    def _drop_from_cache(cls, _id):
+        """Remove the cached puzzle. Return whether it was there."""
+        cache_path = cls._cache_path(_id)
+        if not cache_path or not os.path.isfile(cache_path):
+            return False
+
+        os.remove(cache_path)
+        return True
 
     @classmethod
     def read(cls, _id):
         """Find and parse the columns and rows of a webpbn nonogram by id"""
-        xml = cls.get_puzzle_xml(_id)
         try:
-            tree = ElementTree.parse(xml)
+            with closing(cls.get_puzzle_xml(_id)) as xml:
+                return cls._parse(xml, _id)
+        except (ElementTree.ParseError, PbnNotFoundError):
+            # the cached file can be corrupted, so download it again
+            if not cls._drop_from_cache(_id):
+                raise
+
+            LOG.warning('The cached puzzle %r is corrupted, fetching it again', _id)
+            with closing(cls.get_puzzle_xml(_id)) as xml:
+                return cls._parse(xml, _id)
+
+    @classmethod
+    def _parse(cls, xml, _id):
+        """Parse the columns, rows (and colors) from the puzzle's XML file object"""
+
+        new_colors = 0
+        colors = ColorMap()
+        puzzle_attrib = None
+        lines = {'columns': [], 'rows': []}
+
+        # walk over the document only once, collecting all the needed elements
+        current_lines = None
+        try:
+            for event, elem in ElementTree.iterparse(xml, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    if tag == 'clues':
+                        current_lines = lines.get(elem.attrib.get('type'))
+                    elif tag == 'puzzle' and elem.attrib.get('type') == 'grid':
+                        puzzle_attrib = elem.attrib
+                    continue
+
+                if tag == 'line':
+                    if current_lines is not None:
+                        current_lines.append(elem)
+                elif tag == 'clues':
+                    current_lines = None
+                elif tag == 'color':
+                    new_colors += 1
+                    colors.make_color(elem.attrib['name'], elem.text, elem.attrib['char'])
+                    elem.clear()
+                elif tag == 'solution':
+                    # can be large and not needed at all
+                    elem.clear()
+
         except ElementTree.ParseError as exc:
             str_e = str(exc)
             if str_e.startswith('syntax error'):
                 raise PbnNotFoundError(_id)
             raise
 
-        new_colors = 0
-        colors = ColorMap()
-        for color in tree.findall('.//color'):
-            new_colors += 1
-            colors.make_color(color.attrib['name'], color.text, color.attrib['char'])
-
-        if new_colors < 3:
-            default_color = None
-        else:
-            puzzle = tree.findall('.//puzzle[@type="grid"]')[0]
-            default_color = puzzle.attrib['defaultcolor']
+        has_colors = new_colors > 2
+        default_color = puzzle_attrib['defaultcolor'] if has_colors else None
+        parse_clue = partial(_parse_clue, default_color=default_color)
 
-        columns = [cls._parse_clue(clue, default_color)
-                   for clue in tree.findall('.//clues[@type="columns"]/line')]
-        rows = [cls._parse_clue(clue, default_color)
-                for clue in tree.findall('.//clues[@type="rows"]/line')]
+        columns = [parse_clue(clue) for clue in lines['columns']]
+        rows = [parse_clue(clue) for clue in lines['rows']]
 
-        if new_colors < 3:
+        if not has_colors:
             return columns, rows
 
         return columns, rows, colors
@@ -244,16 +509,18 @@ class Pbn(object):
 class PbnLocal(Pbn):
     """Read locally saved puzzled from http://webpbn.com/"""
 
+    CACHE_DIR = None
+
     @classmethod
     def get_puzzle_xml(cls, _id):
         return open(_id)
 
 
-def _get_utf8(string):
-    if isinstance(string, binary_type):
-        return string.decode('utf-8', errors='ignore')
+def _get_utf8(text):
+    if isinstance(text, binary_type):
+        return text.decode('utf-8', errors='ignore')
 
-    return string
+    return text
 
 
 class NonogramsOrg(object):
@@ -8,7 +8,16 @@ from __future__ import unicode_literals, print_function, division
 
 import sys
 from functools import partial, wraps
-from itertools import islice
+from itertools import islice, chain
+
+try:
+    # noinspection PyPackageRequirements
+    import numpy as np
+except ImportError:
+    np = None
+
+# for the shorter lists the NumPy overhead is bigger than the gain
+_VECTORIZE_THRESHOLD = 64
 
 
 def merge_dicts(*dict_args, **kwargs):
@@ -18,9 +27,14 @@ def merge_dicts(*dict_args, **kwargs):
     precedence goes to key value pairs in latter dicts.
     """
     _type = kwargs.get('type', dict)
+    if not dict_args:
+        # noinspection PyCallingNonCallable
+        return _type()
+
+    # copying the first dict is cheaper than updating an empty one
     # noinspection PyCallingNonCallable
-    result = _type()
-    for dictionary in dict_args:
+    result = _type(dict_args[0])
+    for dictionary in dict_args[1:]:
         result.update(dictionary)
     return result
 
@@ -36,8 +50,11 @@ def pad(coll, size, padding, left=True):
         return coll
 
     padding = [padding] * padding_size
-    new_list = list(coll)
-    return padding + new_list if left else new_list + padding
+    if not isinstance(coll, list):
+        coll = list(coll)
+
+    # the concatenation creates a new list anyway
+    return padding + coll if left else coll + padding
 
 
 def interleave(list_a, list_b):
@@ -87,6 +104,11 @@ def list_replace(a_list, old, new):
     """
     Replaces every `old` item in `a_list` with `new` item
     """
+    if len(a_list) >= 64:
+        # for the long lists rebuilding the whole list is cheaper
+        a_list[:] = [new if item == old else item for item in a_list]
+        return
+
     for i, item in enumerate(a_list):
         if item == old:
             a_list[i] = new
@@ -108,18 +130,45 @@ def split_seq(iterable, size):
         item = list(islice(iterator, size))
 
 
+def split_seq_view(iterable, size):
+    """
+    Lazy version of the `split_seq`: the chunks are not copied into lists
+    but the consumer should exhaust every chunk before taking the next one
+
+    :param iterable: any iterable
+    :param size: chunk size
+    :return: chunks (iterators) one by one
+    """
+    iterator = iter(iterable)
+    sentinel = object()
+    while True:
+        first = next(iterator, sentinel)
+        if first is sentinel:
+            return
+
+        yield chain((first,), islice(iterator, size - 1))
+
+
 def avg(iterable):
     """
     Return the average value of an iterable of numbers
     """
 
+    if hasattr(iterable, '__len__'):
+        if not len(iterable):
+            return None
+        return sum(iterable) / len(iterable)
+
     # the iterable can be an iterator that gets exhausted
-    # while `sum` and `len` will return 0
-    list_copy = list(iterable)
-    if not list_copy:
+    # while `sum` and `len` will return 0, so count in a single pass
+    total, count = 0, 0
+    for count, number in enumerate(iterable, 1):
+        total += number
+
+    if not count:
         return None
 
-    return sum(list_copy) / len(list_copy)
+    return total / count
 
 
 def expand_generator(func=None, type_=list):
@@ -157,7 +206,12 @@ def max_continuous_interval(int_list):
     The size of the longest continuous
     number sequence in a list
     """
-    int_list = sorted(int_list)
+    int_list = list(int_list)
+
+    if np is not None and len(int_list) >= _VECTORIZE_THRESHOLD:
+        return _max_continuous_interval_np(int_list)
+
+    int_list.sort()
 
     if not int_list:
         return 0
@@ -173,3 +227,15 @@ def max_continuous_interval(int_list):
 
     max_size = max(max_size, last - first + 1)
     return max_size
+
+
+def _max_continuous_interval_np(int_list):
+    """
+    The same as `max_continuous_interval` but vectorized:
+    find the breaks between the sorted numbers and
+    measure the distances between them
+    """
+    arr = np.sort(np.asarray(int_list, dtype=np.int64))
+    breaks = np.flatnonzero(np.diff(arr) != 1)
+    bounds = np.concatenate(([-1], breaks, [len(arr) - 1]))
+    return int(np.diff(bounds).max())
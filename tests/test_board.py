@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from __future__ import unicode_literals, print_function
+from __future__ import unicode_literals, print_function, division
 
 import time
 from io import StringIO
@@ -11,11 +11,16 @@ from pynogram.core import propagation
 from pynogram.core.backtracking import Solver
 from pynogram.core.board import (
     BlackBoard, make_board,
+    CellState,
 )
 from pynogram.core.color import (
     ColorMap, Color,
 )
-from pynogram.core.common import BlottedBlock
+from pynogram.core.common import (
+    BOX, SPACE,
+    BlottedBlock,
+    NonogramError,
+)
 from pynogram.core.renderer import (
     BaseAsciiRenderer,
     AsciiRenderer,
@@ -110,6 +115,105 @@ class TestBoard(object):
         assert str(ei.value), \
             'Cannot allocate row [1, 1] in just 2 cells'
 
+    @pytest.mark.parametrize('use_numpy', [False, True])
+    def test_rollback_journal(self, use_numpy):
+        board = tested_board(use_numpy=use_numpy)
+        board.set_row(0, [False] * 8)
+        before = board.make_snapshot()
+
+        board.start_journal()
+        propagation.solve(board)
+        assert board.is_solved_full
+
+        board.rollback_journal()
+        assert not list(board.diff(before, board.cells, have_deletions=True))
+
+    @pytest.mark.parametrize('use_numpy', [False, True])
+    def test_rollback_journal_lines_and_cells(self, use_numpy):
+        board = tested_board(use_numpy=use_numpy)
+        board.set_row(1, [False, True] + [None] * 6)
+
+        def _state():
+            return (
+                [list(row) for row in board.cells],
+                board.unsolved_cells_number,
+                [board.row_solution_rate(i) for i in range(board.height)],
+                [board.column_solution_rate(i) for i in range(board.width)],
+            )
+
+        before = _state()
+
+        board.start_journal()
+        board.set_row(0, [False] * 8)
+        board.set_column(1, [True] * 11)
+        board.set_color(CellState(2, 3, True))
+        board.set_row(2, [False] * 8)
+        assert board.unsolved_cells_number != before[1]
+
+        board.rollback_journal()
+        assert _state() == before
+
+        # the journal is stopped
+        board.set_row(0, [False] * 8)
+        board.rollback_journal()
+        assert list(board.cells[0]) == [False] * 8
+
+    def test_journal_cannot_be_started_twice(self):
+        board = tested_board()
+        board.start_journal()
+        with pytest.raises(RuntimeError, match='already started'):
+            board.start_journal()
+
+    def test_probe_stops_journal_on_unexpected_error(self, monkeypatch):
+        board = tested_board()
+        solver = Solver(board)
+
+        def _fail(cell_state):
+            raise KeyError(cell_state)
+
+        monkeypatch.setattr(solver, 'propagate_change', _fail)
+        with pytest.raises(KeyError):
+            solver.probe(CellState(1, 1, True))
+
+        # can start a new one
+        board.start_journal()
+        board.rollback_journal()
+
+    @pytest.mark.parametrize('use_numpy', [False, True])
+    def test_direct_cells_change(self, use_numpy):
+        board = tested_board(use_numpy=use_numpy)
+        assert not board.is_solved_full
+        assert board.solution_rate == 0
+
+        for row in board.cells:
+            for j in range(board.width):
+                row[j] = SPACE
+
+        assert board.is_solved_full
+        assert board.solution_rate == 1
+        assert board.column_solution_rate(3) == 1
+        assert board.get_line_tuple(3, is_column=True) == (SPACE,) * board.height
+
+    @pytest.mark.parametrize('use_numpy', [False, True])
+    def test_unsolved_cells_number(self, use_numpy):
+        board = tested_board(use_numpy=use_numpy)
+        assert board.unsolved_cells_number == 88
+
+        board.set_row(0, [False] * 8)
+        board.set_column(0, [False] * 11)
+        board.set_color((1, 1, True))
+        board.unset_color((1, 2, False))
+        assert board.unsolved_cells_number == 88 - 8 - 10 - 2
+        assert board.row_solution_rate(0) == 1
+        assert board.row_solution_rate(1) == 3 / 8
+        assert board.column_solution_rate(0) == 1
+        assert board.column_solution_rate(1) == 2 / 11
+        assert board.column_solution_rate(3) == 1 / 11
+
+        propagation.solve(board)
+        assert board.unsolved_cells_number == 0
+        assert board.solution_rate == 1
+
 
 class TestSolution(object):
     @pytest.fixture
@@ -248,6 +352,13 @@ class TestSolution(object):
         # it takes only one round to solve that
         assert sum(rounds) == 1
 
+    def test_prefilled_contradictory_line(self):
+        board = make_board([[1], [1]], [[1], [1]])
+        board.set_row(0, [BOX, BOX])
+
+        with pytest.raises(NonogramError, match='Bad line'):
+            propagation.solve(board)
+
     # @pytest.mark.skip('Too hard for unit tests')
     def test_various_modes(self):
         solutions = dict()
@@ -131,6 +131,15 @@ class TestNonogramFiniteStateMachine(object):
 
         assert ie.value.code == 1
 
+    def test_shared_machine(self):
+        nfsm = BaseMachineSolver.get_nfsm((3, 2))
+        assert BaseMachineSolver.get_nfsm((3, 2)) is nfsm
+        assert BaseMachineSolver.get_nfsm((2, 3)) is not nfsm
+
+        solved = tuple(nfsm.solve_with_reverse_tracking((UNKNOWN,) * 6))
+        assert solved == (BOX, BOX, BOX, SPACE, BOX, BOX)
+        assert nfsm.current_state == nfsm.initial_state
+
     def test_from_list(self):
         for nfsm in (
                 BaseMachineSolver.make_nfsm([1, 1]),
@@ -3,12 +3,15 @@
 from __future__ import unicode_literals, print_function
 
 import os
+from io import BytesIO
 
 import pytest
+from six import PY2
 from six.moves import StringIO
 # noinspection PyUnresolvedReferences
 from six.moves.configparser import NoSectionError
 
+from pynogram import reader
 from pynogram.core import propagation
 from pynogram.core.board import BlackBoard
 from pynogram.core.common import clues
@@ -16,6 +19,8 @@ from pynogram.core.propagation import solve
 from pynogram.core.renderer import BaseAsciiRenderer
 from pynogram.reader import (
     example_file, read_ini, read_example,
+    parse_line,
+    FastIniParser, MultiLineConfigParser,
     Pbn, PbnNotFoundError,
     NonogramsOrg,
 )
@@ -57,6 +62,99 @@ class TestReader(object):
         with pytest.raises(NoSectionError, match="No section: u?'clues'"):
             read_ini(stream)
 
+    @pytest.mark.skipif(PY2, reason="the fast parser is not used in Python2")
+    def test_fast_parser_same_as_config_parser(self):
+        text = '\n'.join([
+            '# comment', '[clues]',
+            'columns = 1 2  ; inline comment',
+            '    3', '', '  # comment', '    4',
+            'rows: 5', '[colors]', 'R = (red) *',
+        ])
+        fast = FastIniParser.parse(text.splitlines())
+        full = MultiLineConfigParser()
+        full.read_string(text)
+
+        for option in ('columns', 'rows'):
+            assert fast.get_list('clues', option) == full.get_list('clues', option)
+        assert fast.items('clues') == full.items('clues')
+        assert fast.items('colors') == full.items('colors')
+
+    @pytest.mark.skipif(PY2, reason="the fast parser is not used in Python2")
+    def test_fast_parser_gives_up_on_duplicates(self):
+        # pylint: disable=no-name-in-module
+        from configparser import DuplicateOptionError
+
+        text = '\n'.join(['[clues]', 'rows=1', 'columns=1', 'rows=2'])
+        assert FastIniParser.parse(text.splitlines()) is None
+
+        with pytest.raises(DuplicateOptionError):
+            read_ini(StringIO(text))
+
+    def test_colors(self):
+        text = '\n'.join(['[clues]', 'rows=1g', 'columns=1g',
+                          '[colors]', 'g=(0, 204, 0) %', 'r=(red) )'])
+        columns, rows, colors = read_ini(StringIO(text))
+
+        assert colors['g'].rgb == '0, 204, 0'
+        assert colors['g'].symbol == '%'
+        assert colors['r'].rgb == 'red'
+        assert colors['r'].symbol == ')'
+
+    def test_bad_color(self):
+        text = '\n'.join(['[clues]', 'rows=1g', 'columns=1g',
+                          '[colors]', 'g=0, 204, 0 %'])
+
+        with pytest.raises(ValueError, match='Bad color definition'):
+            read_ini(StringIO(text))
+
+    def test_read_file_twice(self, tmpdir):
+        board_file = tmpdir.join('board.txt')
+        board_file.write('\n'.join(['[clues]', 'rows=1', 'columns=1']))
+
+        columns, rows = read_ini(str(board_file))
+        assert (columns, rows) == (('1',), ('1',))
+
+        # the cached result is shared, so it can not be changed
+        with pytest.raises(AttributeError):
+            columns.append('2')
+        assert read_ini(str(board_file)) == (('1',), ('1',))
+
+        board_file.write('\n'.join(['[clues]', 'rows=2', 'columns=1, 1']))
+        board_file.setmtime(board_file.mtime() + 10)
+        assert read_ini(str(board_file)) == (('1', '1'), ('2',))
+
+    def test_read_file_by_relative_name(self, tmpdir, monkeypatch):
+        first = tmpdir.mkdir('a').join('board.txt')
+        first.write('\n'.join(['[clues]', 'rows=1', 'columns=1']))
+        # the same size and modification time
+        second = tmpdir.mkdir('b').join('board.txt')
+        second.write('\n'.join(['[clues]', 'rows=2', 'columns=2']))
+        for board_file in (first, second):
+            os.utime(str(board_file), (1000000000, 1000000000))
+
+        monkeypatch.chdir(tmpdir.join('a'))
+        assert read_ini('board.txt') == (('1',), ('1',))
+
+        monkeypatch.chdir(tmpdir.join('b'))
+        assert read_ini('board.txt') == (('2',), ('2',))
+
+    def test_read_file_rewritten_with_same_mtime(self, tmpdir):
+        board_file = tmpdir.join('board.txt')
+        board_file.write('\n'.join(['[clues]', 'rows=1', 'columns=1']))
+        mtime = board_file.mtime()
+        assert read_ini(str(board_file)) == (('1',), ('1',))
+
+        board_file.write('\n'.join(['[clues]', 'rows=1', 'columns=1, 1']))
+        board_file.setmtime(mtime)
+        assert read_ini(str(board_file)) == (('1', '1'), ('1',))
+
+    def test_parse_line(self):
+        assert parse_line('1 2, "3",') == ['1 2', '3']
+
+    @pytest.mark.parametrize('description', ['', '  \t'])
+    def test_parse_empty_line(self, description):
+        assert parse_line(description) is None
+
     def test_txt_suffix(self):
         columns1, rows1 = read_example('w.txt')
         columns2, rows2 = read_example('w')
@@ -67,8 +165,23 @@ class TestReader(object):
     def test_not_existed_file_does_not_append_txt(self):
         assert example_file('board.pbm').endswith('board.pbm')
 
+    def test_example_added_after_listing(self, tmpdir, monkeypatch):
+        examples_dir = tmpdir.mkdir('examples')
+        monkeypatch.setattr(reader, 'CURRENT_DIR', str(tmpdir))
+
+        assert example_file('new') == str(examples_dir.join('new'))
+
+        # e.g. saved by the long-running web application
+        examples_dir.join('new.txt').write('')
+        assert example_file('new') == str(examples_dir.join('new.txt'))
+
 
 class TestPbn(object):
+    @pytest.fixture(autouse=True)
+    def no_user_cache(self, monkeypatch):
+        # never touch the cache enabled by the user's environment
+        monkeypatch.setattr(Pbn, 'CACHE_DIR', None)
+
     def test_simple(self):
         columns, rows = Pbn.read(1)
         assert columns == [(2, 1), (2, 1, 3), (7,), (1, 3), (2, 1)]
@@ -78,6 +191,34 @@ class TestPbn(object):
         with pytest.raises(PbnNotFoundError, match='5'):
             Pbn.read(5)
 
+    def test_cached_download(self, tmpdir, monkeypatch):
+        xml = b''.join([
+            b'<puzzleset><puzzle type="grid" defaultcolor="black">',
+            b'<clues type="columns"><line><count>1</count></line></clues>',
+            b'<clues type="rows"><line><count>1</count></line></clues>',
+            b'</puzzle></puzzleset>',
+        ])
+        urls = []
+
+        def _urlopen(url):
+            urls.append(url)
+            return BytesIO(xml)
+
+        monkeypatch.setattr(reader, 'urlopen', _urlopen)
+        monkeypatch.setattr(Pbn, 'CACHE_DIR', str(tmpdir.join('cache')))
+
+        assert Pbn.read(1) == ([(1,)], [(1,)])
+        assert Pbn.read(1) == ([(1,)], [(1,)])
+        assert len(urls) == 1
+        assert tmpdir.join('cache', '1.xml').read_binary() == xml
+        assert tmpdir.join('cache').listdir() == [tmpdir.join('cache', '1.xml')]
+
+        # the truncated file is not trusted
+        tmpdir.join('cache', '1.xml').write_binary(xml[:50])
+        assert Pbn.read(1) == ([(1,)], [(1,)])
+        assert len(urls) == 2
+        assert tmpdir.join('cache', '1.xml').read_binary() == xml
+
     def test_colored(self):
         columns, rows, colors = Pbn.read(898)
         assert [(c.name, c.rgb, c.symbol) for c in colors.iter_colors()] == [
@@ -16,6 +16,7 @@ from pynogram.core.common import (
 )
 from pynogram.core.renderer import (
     Renderer,
+    ClueCell,
     BaseAsciiRenderer,
     AsciiRenderer,
     SvgRenderer,
@@ -47,6 +48,16 @@ class TestRenderer(object):
         renderer.board_init(BlackBoard([], []))
         assert prev_board != id(renderer.board)
 
+    def test_shared_clue_cells(self):
+        cell = ClueCell.get(3)
+        assert ClueCell.get(3) is cell
+        assert cell.ascii_icon() == '3'
+
+        colored = ClueCell.get((3, 4))
+        assert colored is not cell
+        assert ClueCell.get([3, 4]) is colored
+        assert (colored.value, colored.color) == (3, 4)
+
 
 # noinspection PyShadowingNames
 class TestConsoleBoard(object):
@@ -93,6 +104,20 @@ class TestConsoleBoard(object):
             '  0 _ _ _ _ _ _ _ _',
         ])
 
+    def test_draw_too_wide_row(self, board):
+        cells = [list(row) for row in board.cells]
+        cells[2].append(SPACE)
+
+        with pytest.raises(IndexError, match='The row 2 does not fit'):
+            board.renderer.draw_grid(cells)
+
+    def test_draw_too_many_rows(self, board):
+        cells = [list(row) for row in board.cells]
+        cells.append([SPACE] * board.width)
+
+        with pytest.raises(IndexError, match='does not fit'):
+            board.renderer.draw_grid(cells)
+
     def test_bad_cell_value(self, board):
         board.cells[2][0] = str('space')
 
@@ -386,55 +411,6 @@ class TestSvg(object):
                     </symbol>
 
 
-                    <symbol id="x2-b-black">
-                        <polygon fill="blue" points="0,0 0,15 15,0" />
-                        <polygon fill="#000" points="0,15 15,0 15,15" />
-                    </symbol>
-                    <symbol id="x2-b-r">
-                        <polygon fill="blue" points="0,0 0,15 15,0" />
-                        <polygon fill="red" points="0,15 15,0 15,15" />
-                    </symbol>
-                    <symbol id="x2-b-white">
-                        <polygon fill="blue" points="0,0 0,15 15,0" />
-                        <polygon fill="#fff" points="0,15 15,0 15,15" />
-                    </symbol>
-
-                    <symbol id="x2-black-r">
-                        <polygon fill="#000" points="0,0 0,15 15,0" />
-                        <polygon fill="red" points="0,15 15,0 15,15" />
-                    </symbol>
-                    <symbol id="x2-black-white">
-                        <polygon fill="#000" points="0,0 0,15 15,0" />
-                        <polygon fill="#fff" points="0,15 15,0 15,15" />
-                    </symbol>
-
-                    <symbol id="x2-r-white">
-                        <polygon fill="red" points="0,0 0,15 15,0" />
-                        <polygon fill="#fff" points="0,15 15,0 15,15" />
-                    </symbol>
-
-
-                    <symbol id="x3-b-black-r">
-                        <rect fill="blue" height="15" width="15" x="0" y="0" />
-                        <polygon fill="#000" points="0,0 0,10.61 10.61,0" />
-                        <polygon fill="red" points="15,4.39 4.39,15 15,15" />
-                    </symbol>
-                    <symbol id="x3-b-black-white">
-                        <rect fill="blue" height="15" width="15" x="0" y="0" />
-                        <polygon fill="#000" points="0,0 0,10.61 10.61,0" />
-                        <polygon fill="#fff" points="15,4.39 4.39,15 15,15" />
-                    </symbol>
-                    <symbol id="x3-b-r-white">
-                        <rect fill="blue" height="15" width="15" x="0" y="0" />
-                        <polygon fill="red" points="0,0 0,10.61 10.61,0" />
-                        <polygon fill="#fff" points="15,4.39 4.39,15 15,15" />
-                    </symbol>
-                    <symbol id="x3-black-r-white">
-                        <rect fill="#000" height="15" width="15" x="0" y="0" />
-                        <polygon fill="red" points="0,0 0,10.61 10.61,0" />
-                        <polygon fill="#fff" points="15,4.39 4.39,15 15,15" />
-                    </symbol>
-
                     <symbol id="space"><circle cx="0" cy="0" r="1.5" /></symbol>
 
 
@@ -491,26 +467,16 @@ class TestSvg(object):
                     <use x="52.5" xlink:href="#space" y="52.5" />
                 </g>
                 <g class="color-black" />
-                <g class="x2-black-white" />
                 <g class="color-r">
                     <use x="15" xlink:href="#color-r" y="30" />
                     <use x="30" xlink:href="#color-r" y="30" />
                     <use x="45" xlink:href="#color-r" y="30" />
                 </g>
-                <g class="x2-r-white" />
-                <g class="x2-black-r" />
-                <g class="x3-black-r-white" />
                 <g class="color-b">
                     <use x="15" xlink:href="#color-b" y="60" />
                     <use x="30" xlink:href="#color-b" y="60" />
                     <use x="45" xlink:href="#color-b" y="60" />
                 </g>
-                <g class="x2-b-white" />
-                <g class="x2-b-black" />
-                <g class="x3-b-black-white" />
-                <g class="x2-b-r" />
-                <g class="x3-b-r-white" />
-                <g class="x3-b-black-r" />
 
                 <g class="grid-lines">
                     <line class="bold" x1="0" x2="60" y1="30" y2="30" />
@@ -528,3 +494,30 @@ class TestSvg(object):
         svg_def = ''.join([
             line for line in [line.strip() for line in svg_def.split('\n')] if line])
         assert table[1] == svg_def
+
+    def test_color_mixed_symbols_on_demand(self, stream):
+        b = make_board(*color_board_def(), renderer=SvgRenderer, stream=stream)
+        propagation.solve(b)
+
+        red, blue = b.color_id_by_name('r'), b.color_id_by_name('b')
+        cells = [list(row) for row in b.cells]
+        cells[1][1] = red | blue
+
+        b.draw(cells=cells)
+        svg = stream.getvalue()
+
+        assert '<symbol id="x2-b-r">' in svg
+        assert '<g class="x2-b-r"><use x="30" xlink:href="#x2-b-r" y="45" /></g>' in svg
+        # only the combinations used on the board are defined
+        assert 'x2-b-black' not in svg
+        assert 'x3-' not in svg
+
+    def test_draw_twice(self, stream):
+        b = self.one_row_table(2, stream)
+        propagation.solve(b)
+
+        b.draw()
+        first = stream.getvalue()
+
+        b.draw()
+        assert stream.getvalue() == first * 2
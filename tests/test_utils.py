@@ -16,6 +16,8 @@ from pynogram.utils.iter import (
     max_safe,
     avg,
     max_continuous_interval,
+    list_replace,
+    split_seq, split_seq_view,
 )
 from pynogram.utils.other import (
     get_version,
@@ -55,6 +57,15 @@ class TestMergeDicts(object):
             'baz': 3,
         }, 'Merge is not a communicative operation'
 
+    def test_first_not_changed(self):
+        d = {'foo': 1}
+        merged = merge_dicts(d, {'bar': 2})
+        assert merged is not d
+        assert d == {'foo': 1}
+
+    def test_no_dicts(self):
+        assert merge_dicts() == {}
+
 
 class TestPadList(object):
     @pytest.fixture(scope='class')
@@ -70,6 +81,14 @@ class TestPadList(object):
     def test_right(self, to_pad):
         assert pad(to_pad, 5, 5, left=False) == [1, 2, 3, 5, 5]
 
+    def test_original_not_changed(self, to_pad):
+        padded = pad(to_pad, 4, 0)
+        assert padded is not to_pad
+        assert to_pad == [1, 2, 3]
+
+    def test_tuple(self):
+        assert pad((1, 2), 3, 0, left=False) == [1, 2, 0]
+
 
 class TestInterleave(object):
     def test_simple(self):
@@ -142,6 +161,18 @@ class TestMaxSafe(object):
         assert max_safe(_gen(), default=3) == 5
 
 
+class TestSplitSeq(object):
+    def test_lists(self):
+        assert list(split_seq(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_views(self):
+        chunks = [list(chunk) for chunk in split_seq_view(iter(range(7)), 3)]
+        assert chunks == list(split_seq(range(7), 3))
+
+    def test_empty_view(self):
+        assert list(split_seq_view([], 3)) == []
+
+
 class TestAvg(object):
     def test_basic(self):
         assert avg([1, 2, 3]) == 2
@@ -159,6 +190,9 @@ class TestAvg(object):
     def test_empty(self):
         assert avg([]) is None
 
+    def test_empty_iterator(self):
+        assert avg(x for x in []) is None
+
 
 class TestPriorityDict(object):
     @pytest.fixture
@@ -356,6 +390,17 @@ class TestPowers(object):
             assert from_two_powers(factors) == n
 
 
+class TestListReplace(object):
+    @pytest.mark.parametrize('size', [5, 100])
+    def test_in_place(self, size):
+        a_list = ['_', 'X', '_', '.', '_'] * size
+        same_list = a_list
+
+        list_replace(a_list, '_', None)
+        assert a_list is same_list
+        assert a_list == [None, 'X', None, '.', None] * size
+
+
 class TestMaxInterval(object):
     def test_empty(self):
         assert max_continuous_interval([]) == 0
@@ -374,3 +419,8 @@ class TestMaxInterval(object):
 
     def test_four(self):
         assert max_continuous_interval([1, 3, 5, 6, 8, 9, 10, 12, 13, 15, 16, 17, 18]) == 4
+
+    def test_long_unordered(self):
+        numbers = list(range(0, 200, 2)) + list(range(301, 350)) + [250, 251, 251, 252]
+        random.shuffle(numbers)
+        assert max_continuous_interval(numbers) == 49